@@ -0,0 +1,47 @@
+"""Time to import moonwalking and get the block of one currency
+
+Each measurement runs in a fresh interpreter, e.g.::
+
+    env $(cat .test.env | xargs) python dev/benchmark_import.py btc eth
+
+``main`` imports every chain, as importing moonwalking.main does,
+``wallets`` gets the block from the lazy registry of moonwalking.wallets.
+"""
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+CODE = {
+    'main': 'import moonwalking.main; moonwalking.main.BLOCKS[{ccy!r}]',
+    'wallets': (
+        'import moonwalking.wallets; moonwalking.wallets.block({ccy!r})'
+    ),
+}
+TIMED = (
+    'import time; start = time.perf_counter(); {code}; '
+    'print(time.perf_counter() - start)'
+)
+
+
+def measure(code: str) -> float:
+    """Median seconds of RUNS fresh interpreters running code"""
+    times = [
+        float(subprocess.run(
+            [sys.executable, '-c', TIMED.format(code=code)],
+            check=True, stdout=subprocess.PIPE, universal_newlines=True,
+        ).stdout)
+        for _ in range(RUNS)
+    ]
+    return statistics.median(times)
+
+
+def main(currencies):
+    for ccy in currencies:
+        for name, code in CODE.items():
+            elapsed = measure(code.format(ccy=ccy))
+            print(f'{ccy:>4} {name:>8}: {elapsed:6.3f}s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or ['btc', 'bch', 'eth', 'lnd'])
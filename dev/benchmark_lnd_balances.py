@@ -0,0 +1,57 @@
+"""Compare LND balance lookups one address at a time with get_balances
+
+Needs the blockchains started with ``make blockchains`` and the test
+environment, e.g.::
+
+    env $(cat .test.env | xargs) python dev/benchmark_lnd_balances.py 2000
+
+Set MULTICALL_ADDR to go through a Multicall contract instead of
+batched eth_calls.
+"""
+import asyncio
+import sys
+import time
+from decimal import Decimal as D
+
+from eth_utils import to_checksum_address
+
+from moonwalking import settings
+from moonwalking.main import Lendingblock
+from moonwalking.testing import create_lnd_contract
+
+
+async def per_address(lnd, addrs):
+    """The lookup as it was, one eth_call per address"""
+    balance_of = lnd.contract_abi['balanceOf']
+    balances = {}
+    for addr in addrs:
+        result = await lnd.post('eth_call', {
+            'data': balance_of.encode(addr),
+            'to': lnd.get_contract_addr(),
+        }, 'latest')
+        balances[addr] = D(int(result, 16) / pow(10, 18))
+    return balances
+
+
+async def main(n):
+    lnd = Lendingblock()
+    if not settings.LND_CONTRACT_ADDR:
+        contract_addr = to_checksum_address(await create_lnd_contract())
+        lnd.get_contract_addr = lambda: contract_addr
+    addrs = [lnd.create_addr()[0] for _ in range(n)]
+    for name, lookup in (
+        ('per address', per_address(lnd, addrs)),
+        ('get_balances', lnd.get_balances(addrs)),
+    ):
+        start = time.monotonic()
+        balances = await lookup
+        elapsed = time.monotonic() - start
+        assert len(balances) == n
+        print(f'{name:>14}: {elapsed:8.3f}s {n / elapsed:10.0f} addr/s')
+    await lnd.close()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
+    )
@@ -1,5 +1,6 @@
-from .base import BaseBlock
+from .registry import BLOCKS
 
 
-def get(ccy: str) -> BaseBlock:
-    return BaseBlock.BLOCKS[ccy]
+def get(ccy: str):
+    """Block of ccy, built on first use"""
+    return BLOCKS[ccy]
@@ -0,0 +1,135 @@
+"""Contract ABI tables
+
+The functions of a contract ABI are compiled once into their selectors
+and argument encoders, so that encoding a call is a dict lookup plus a
+bytes join. Static arguments of the common types are encoded directly,
+functions with any other argument go through ``encode_abi``. Return
+values are decoded with ``decode_abi``.
+"""
+import json
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from eth_abi.abi import decode_abi, encode_abi
+from eth_hash.auto import keccak
+from eth_utils import to_bytes
+from hexbytes import HexBytes
+
+
+def abi_type(param: dict) -> str:
+    """Canonical type of an ABI input or output, tuples included"""
+    type_str = param['type']
+    if type_str.startswith('tuple'):
+        components = ','.join(
+            abi_type(component) for component in param['components']
+        )
+        return f'({components}){type_str[5:]}'
+    return type_str
+
+
+def encode_address(value) -> bytes:
+    data = to_bytes(hexstr=value) if isinstance(value, str) else value
+    if len(data) != 20:
+        raise ValueError(f'{value} is not an address')
+    return bytes(12) + data
+
+
+def encode_uint(value: int) -> bytes:
+    return int(value).to_bytes(32, 'big')
+
+
+def encode_int(value: int) -> bytes:
+    return int(value).to_bytes(32, 'big', signed=True)
+
+
+def encode_bool(value) -> bytes:
+    return encode_uint(1 if value else 0)
+
+
+def get_encoder(type_str: str) -> Optional[Callable]:
+    """Encoder of a static type, None for types left to encode_abi"""
+    if type_str == 'address':
+        return encode_address
+    if type_str == 'bool':
+        return encode_bool
+    if type_str.startswith('uint') and type_str[4:].isdigit():
+        return encode_uint
+    if type_str.startswith('int') and type_str[3:].isdigit():
+        return encode_int
+    return None
+
+
+class AbiFunction(NamedTuple):
+    name: str
+    signature: str
+    selector: str
+    inputs: List[str]
+    outputs: List[str]
+    encoders: Optional[List[Callable]]
+
+    @classmethod
+    def from_abi(cls, entry: dict) -> 'AbiFunction':
+        inputs = [abi_type(param) for param in entry.get('inputs', ())]
+        outputs = [abi_type(param) for param in entry.get('outputs') or ()]
+        signature = f"{entry['name']}({','.join(inputs)})"
+        encoders = [get_encoder(input_type) for input_type in inputs]
+        return cls(
+            name=entry['name'],
+            signature=signature,
+            selector='0x' + keccak(signature.encode())[:4].hex(),
+            inputs=inputs,
+            outputs=outputs,
+            encoders=None if None in encoders else encoders,
+        )
+
+    def encode(self, *args) -> str:
+        """Hex call data of the function with args"""
+        if len(args) != len(self.inputs):
+            raise TypeError(
+                f'{self.signature} takes {len(self.inputs)} arguments'
+            )
+        if self.encoders is None:
+            return self.selector + encode_abi(self.inputs, args).hex()
+        return self.selector + b''.join(
+            encode(arg) for encode, arg in zip(self.encoders, args)
+        ).hex()
+
+    def decode(self, data) -> tuple:
+        """Return values of the function from the result of an eth_call"""
+        return decode_abi(self.outputs, HexBytes(data))
+
+
+class ContractABI:
+    """Functions of a contract by name, signature and selector
+
+    Overloaded functions are found by name as the first one in the ABI
+    and by their signature.
+    """
+    def __init__(self, abi: Sequence[dict]):
+        self.functions: Dict[str, AbiFunction] = {}
+        self.selectors: Dict[str, AbiFunction] = {}
+        for entry in abi:
+            if entry.get('type', 'function') != 'function':
+                continue
+            function = AbiFunction.from_abi(entry)
+            self.functions.setdefault(function.name, function)
+            self.functions[function.signature] = function
+            self.selectors[function.selector] = function
+
+    @classmethod
+    def from_file(cls, path: str) -> 'ContractABI':
+        """ABI of a JSON file, either the ABI or a compiled contract"""
+        with open(path) as fp:
+            data = json.load(fp)
+        return cls(data['abi'] if isinstance(data, dict) else data)
+
+    def __getitem__(self, name: str) -> AbiFunction:
+        return self.functions[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.functions
+
+    def encode(self, name: str, *args) -> str:
+        return self.functions[name].encode(*args)
+
+    def decode(self, name: str, data) -> tuple:
+        return self.functions[name].decode(data)
@@ -1,6 +1,22 @@
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from decimal import Decimal as D
-from typing import Dict, Tuple, List
+from typing import Dict, FrozenSet, Tuple, List, Optional, Sequence, Type
+
+from aiohttp import ClientSession
+
+from .. import settings
+from .batcher import RpcBatcher
+from .config import NETWORKS, BlockConfig
+from .fee import FeeSource, FeeStation, StaticFee
+from .nodes import NodePool
+from .registry import BLOCKS, BlockRegistry
+from ..utils import chunks
+from .validate import get_executor as get_validation_executor
+from .session import (
+    get_session, close_all as close_all_sessions
+)
 
 
 class BlockBaseError(Exception):
@@ -25,7 +41,59 @@ class NotEnoughAmountError(BlockBaseError):
 
 class BaseBlock(ABC):
     CCY: str = None
-    BLOCKS: Dict[str, 'BaseBlock'] = {}
+    URL: str = None
+    WALLET_URL: str = None
+    NETWORK: str = 'testnet' if settings.USE_TESTNET else 'mainnet'
+    CHAIN_ID: int = None
+    POOL_SIZE: int = int(settings.HTTP_POOL_SIZE)
+    BATCH_SIZE: int = int(settings.RPC_BATCH_SIZE)
+    COALESCE_WINDOW: int = int(settings.RPC_COALESCE_WINDOW)  # ms
+    COALESCE_SIZE: int = int(settings.RPC_COALESCE_SIZE)
+    CONCURRENCY: int = int(settings.RPC_CONCURRENCY)
+    VALIDATION_CHUNK_SIZE: int = int(settings.VALIDATION_CHUNK_SIZE)
+    WRITE_METHODS: FrozenSet[str] = frozenset()
+    # calls sent to every node, calls kept on the first healthy one and
+    # calls of the node wallet, see NodePool
+    BROADCAST_METHODS: FrozenSet[str] = frozenset()
+    PINNED_METHODS: FrozenSet[str] = frozenset()
+    WALLET_METHODS: FrozenSet[str] = frozenset()
+    HEIGHT_METHOD: str = None
+    NODE_BALANCING: str = settings.NODE_BALANCING
+    NODE_PROBE_INTERVAL: int = int(settings.NODE_PROBE_INTERVAL)  # s
+    NODE_MAX_LAG: int = int(settings.NODE_MAX_LAG)  # blocks
+    FEE: str = None
+    MAX_FEE: int = None
+    FEE_SOURCES: Tuple[str, ...] = settings.FEE_SOURCES
+    FEE_API: Type[FeeSource] = None
+    FEE_CCY: str = None
+    BLOCKS: BlockRegistry = BLOCKS
+    # thread or process pool doing the CPU bound work, e.g. signing,
+    # None runs it on the event loop
+    executor: Executor = None
+    _batcher: RpcBatcher = None
+
+    def __init__(self, config: BlockConfig = None, **kwargs):
+        """Block from config, the class defaults when not given,
+        with the fields in kwargs replaced
+        """
+        config = (config or self.default_config())._replace(**kwargs)
+        assert config.network in NETWORKS, f'bad network {config.network}'
+        self.config = config
+        self.URL = config.url
+        self.NETWORK = config.network
+        self.CHAIN_ID = config.chain_id
+        self.FEE = config.fee
+        self.MAX_FEE = config.max_fee
+        self.FEE_SOURCES = config.fee_sources
+        self.POOL_SIZE = config.pool_size
+        self.BATCH_SIZE = config.batch_size
+        self.COALESCE_WINDOW = config.coalesce_window
+        self.COALESCE_SIZE = config.coalesce_size
+        self.CONCURRENCY = config.concurrency
+        self.nodes = NodePool(
+            self, config.urls, config.balancing,
+            config.probe_interval, config.max_lag, config.wallet_url,
+        )
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -33,15 +101,186 @@ class BaseBlock(ABC):
 
     @classmethod
     def register(cls):
-        if cls.CCY in BaseBlock.BLOCKS:
-            raise ValueError(f"Block already there for {cls.CCY}")
         if cls.CCY:
-            BaseBlock.BLOCKS[cls.CCY] = cls()
+            BaseBlock.BLOCKS.register(cls)
+
+    @classmethod
+    def default_config(cls) -> BlockConfig:
+        """Config of the class attributes, set from settings"""
+        return BlockConfig(
+            urls=tuple(url for url in (cls.URL or '').split(',') if url),
+            network=cls.NETWORK,
+            chain_id=cls.CHAIN_ID,
+            fee=cls.FEE,
+            max_fee=cls.MAX_FEE,
+            fee_sources=cls.FEE_SOURCES,
+            pool_size=cls.POOL_SIZE,
+            batch_size=cls.BATCH_SIZE,
+            coalesce_window=cls.COALESCE_WINDOW,
+            coalesce_size=cls.COALESCE_SIZE,
+            concurrency=cls.CONCURRENCY,
+            balancing=cls.NODE_BALANCING,
+            probe_interval=cls.NODE_PROBE_INTERVAL,
+            max_lag=cls.NODE_MAX_LAG,
+            wallet_url=cls.WALLET_URL,
+        )
+
+    @property
+    def session(self) -> ClientSession:
+        return get_session(self.URL, self.POOL_SIZE, self)
+
+    @property
+    def batcher(self) -> RpcBatcher:
+        if self._batcher is None:
+            self._batcher = RpcBatcher(
+                self, self.COALESCE_WINDOW / 1000, self.COALESCE_SIZE
+            )
+        return self._batcher
+
+    async def start(self) -> 'BaseBlock':
+        """Open the pooled connections to the nodes"""
+        for node in self.nodes.nodes:
+            get_session(node.url, self.POOL_SIZE, self)
+        if len(self.nodes) > 1:
+            self.nodes.start_probing()
+        return self
+
+    async def close(self):
+        """Release the pooled connections to the nodes, they are closed
+        once no other block uses them
+        """
+        await self.nodes.close()
+
+    @staticmethod
+    async def close_all():
+        """Close the pooled connections of all blocks and fee stations"""
+        await close_all_sessions()
+
+    async def __aenter__(self) -> 'BaseBlock':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_fee_sources(self) -> Dict[str, FeeSource]:
+        sources = {}
+        if self.FEE_API:
+            sources['api'] = self.FEE_API()
+        if self.FEE:
+            sources['static'] = StaticFee(int(self.FEE))
+        return sources
+
+    @property
+    def fee_station(self) -> FeeStation:
+        """Fee station trying the block fee sources in FEE_SOURCES order"""
+        sources = self.get_fee_sources()
+        ccy = self.FEE_CCY or self.CCY
+        return FeeStation(ccy, [
+            sources[name] for name in self.FEE_SOURCES if name in sources
+        ], key=self.get_fee_key())
+
+    def get_fee_key(self) -> str:
+        """Key of the cached fee, blocks share it when their fee policy
+        is the same
+        """
+        ccy = self.FEE_CCY or self.CCY
+        sources = ','.join(self.FEE_SOURCES)
+        return f'{ccy}:{self.NETWORK}:{self.URL}:{sources}:{self.FEE}'
+
+    async def post_json(self, data):
+        return await self.nodes.post_json(data)
+
+    @abstractmethod
+    def get_data(self, method, *params) -> dict:
+        pass
+
+    def get_result(self, resp_dict: dict):
+        return resp_dict['result']
+
+    async def post(self, *args):
+        if self.COALESCE_WINDOW:
+            return await self.batcher.call(*args)
+        resp_dict = await self.post_json(self.get_data(*args))
+        return self.get_result(resp_dict)
+
+    async def post_batch(
+        self, calls: Sequence[Tuple], return_exceptions=False
+    ) -> list:
+        """Send several JSON-RPC calls in a single HTTP round trip
+
+        :param calls: [(method, *params), ...]
+        :param return_exceptions: put the error of a failed call in place
+            of its result instead of raising it
+        :return: results in the same order as calls
+        """
+        if not calls:
+            return []
+        data = []
+        for i, call in enumerate(calls):
+            call_data = self.get_data(*call)
+            call_data['id'] = i
+            data.append(call_data)
+        resp = await self.post_json(data)
+        if isinstance(resp, dict):
+            # the node rejected the batch as a whole
+            resp = [dict(resp, id=i) for i in range(len(calls))]
+        resp_dicts = {resp_dict.get('id'): resp_dict for resp_dict in resp}
+        results = []
+        for i in range(len(calls)):
+            try:
+                results.append(self.get_result(resp_dicts[i]))
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                results.append(exc)
+        return results
+
+    async def post_many(
+        self, calls: Sequence[Tuple], return_exceptions=False
+    ) -> list:
+        """Send any number of JSON-RPC calls
+
+        Calls go in batches of BATCH_SIZE, up to CONCURRENCY batches
+        in flight at a time.
+        """
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def send(batch):
+            async with semaphore:
+                return await self.post_batch(batch, return_exceptions)
+
+        batches = await asyncio.gather(*(
+            send(batch) for batch in chunks(calls, self.BATCH_SIZE)
+        ))
+        return [result for results in batches for result in results]
 
     @abstractmethod
     def validate_addr(self, addr: str):
         pass
 
+    def validate_addr_list(self, addrs: Sequence[str]) -> list:
+        return [self.validate_addr(addr) for addr in addrs]
+
+    async def validate_addrs(
+        self, addrs: Sequence[str]
+    ) -> Dict[str, Optional[str]]:
+        """validate_addr of many addresses
+
+        Distinct addresses are checked VALIDATION_CHUNK_SIZE at a time in
+        the validation thread pool.
+        """
+        unique = list(dict.fromkeys(addrs))
+        loop = asyncio.get_event_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                get_validation_executor(), self.validate_addr_list, chunk
+            )
+            for chunk in chunks(unique, self.VALIDATION_CHUNK_SIZE)
+        ))
+        return dict(zip(
+            unique, (result for chunk in results for result in chunk)
+        ))
+
     @abstractmethod
     async def create_addr(self) -> Tuple[str, str]:
         pass
@@ -50,11 +289,41 @@ class BaseBlock(ABC):
     async def create_wallet(self) -> Tuple[str, str]:
         pass
 
+    async def create_wallets(self, n: int) -> List[Tuple[str, str]]:
+        return await asyncio.gather(*(
+            self.create_wallet() for _ in range(n)
+        ))
+
+    async def create_pooled_wallets(self, n: int) -> List[Tuple[str, str]]:
+        """Wallets to keep in a :class:`.WalletPool`, nothing of value
+        may be sent to them before :meth:`fund_wallets`
+        """
+        return await self.create_wallets(n)
+
+    async def fund_wallets(self, wallets: List[Tuple[str, str]]):
+        """Fund pooled wallets as they are handed out"""
+
+    async def run_in_executor(self, func, *args):
+        """Run func in the block executor, inline when there is none
+
+        With a process pool func and args must be picklable, so pass
+        module level functions rather than methods of the block.
+        """
+        if self.executor is None:
+            return func(*args)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def sign(self, priv, tx):
+        """Sign tx without blocking the event loop"""
+        return await self.run_in_executor(self.sign_tx, priv, tx)
+
     async def send_money(
-        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True
+        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True,
+        **kwargs
     ) -> str:
-        tx = await self.build_tx(priv, addrs, split_fee)
-        signed = self.sign_tx(priv, tx)
+        tx = await self.build_tx(priv, addrs, split_fee, **kwargs)
+        signed = await self.sign(priv, tx)
         return await self.broadcast_tx(signed)
 
     @abstractmethod
@@ -69,6 +338,16 @@ class BaseBlock(ABC):
     async def broadcast_tx(self, tx):
         pass
 
+    def get_known_tx_id(self, tx, error: Exception) -> str:
+        """Id of tx when error says the node already has it"""
+        return None
+
     @abstractmethod
     async def get_balance(self, addr: str) -> D:
         pass
+
+    async def get_balances(self, addrs: Sequence[str]) -> Dict[str, D]:
+        balances = await asyncio.gather(*(
+            self.get_balance(addr) for addr in addrs
+        ))
+        return dict(zip(addrs, balances))
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from typing import Dict, List, Tuple
+
+
+class RpcBatcher:
+    """Coalesce JSON-RPC calls into batches
+
+    Calls issued within ``window`` seconds of each other, up to
+    ``max_size`` of them, are sent to the node with a single
+    :meth:`.BaseBlock.post_batch`. Identical read calls already waiting
+    for a response share the same future.
+    """
+    def __init__(self, block, window: float, max_size: int):
+        self.block = block
+        self.window = window
+        self.max_size = max_size
+        self.loop = None
+        self.handle = None
+        self.pending: List[Tuple[tuple, asyncio.Future]] = []
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+    async def call(self, *args):
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            self.reset(loop)
+        key = self.get_key(args)
+        future = self.inflight.get(key) if key else None
+        if future is None:
+            future = loop.create_future()
+            if key:
+                self.inflight[key] = future
+                future.add_done_callback(
+                    lambda f: self.inflight.pop(key, None)
+                )
+            self.pending.append((args, future))
+            if len(self.pending) >= self.max_size:
+                self.flush()
+            elif self.handle is None:
+                self.handle = loop.call_later(self.window, self.flush)
+        # shield so that a cancelled caller does not cancel the others
+        return await asyncio.shield(future)
+
+    def get_key(self, args):
+        if args[0] in self.block.WRITE_METHODS:
+            return None
+        return json.dumps(args, sort_keys=True, default=str)
+
+    def reset(self, loop):
+        self.loop = loop
+        self.handle = None
+        self.pending = []
+        self.inflight = {}
+
+    def flush(self):
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+        pending, self.pending = self.pending, []
+        if pending:
+            self.loop.create_task(self.send(pending))
+
+    async def send(self, pending):
+        try:
+            results = await self.block.post_batch(
+                [args for args, _ in pending],
+                return_exceptions=True,
+            )
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
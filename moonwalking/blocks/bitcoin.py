@@ -0,0 +1,24 @@
+from .. import settings
+from .bitcoin_generic import BitcoinGeneric
+from .fee import BitcoinFeesApi
+from .validate import NETCODES
+
+
+class Bitcoin(BitcoinGeneric):
+    CCY = 'btc'
+    MAX_FEE = 100
+    FEE = settings.BITCOIN_FEE
+    FEE_API = BitcoinFeesApi
+    URL = settings.BITCOIN_URL
+    WALLET_URL = settings.BITCOIN_WALLET_URL
+    NETCODES = NETCODES['btc']
+    NET_WALLETS = {'mainnet': 'btc', 'testnet': 'btctest'}
+
+
+class Litecoin(BitcoinGeneric):
+    CCY = 'ltc'
+    FEE = settings.LITECOIN_FEE
+    URL = settings.LITECOIN_URL
+    WALLET_URL = settings.LITECOIN_WALLET_URL
+    NETCODES = NETCODES['ltc']
+    NET_WALLETS = {'mainnet': 'ltc', 'testnet': 'ltctest'}
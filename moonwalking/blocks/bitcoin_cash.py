@@ -0,0 +1,140 @@
+from decimal import Decimal as D
+from operator import attrgetter
+from typing import Dict, List, Sequence, Tuple
+
+from bitcash import PrivateKeyTestnet, PrivateKey
+from bitcash.network.meta import Unspent
+from bitcash.transaction import create_p2pkh_transaction
+from bitcoin.core import COIN
+
+from cashaddress.convert import to_legacy_address
+
+from pycoin.tx.Tx import Tx
+
+from .. import settings
+from .bitcoin_generic import BitcoinGeneric, to_string
+from .exc import NotEnoughAmountError
+from .validate import NETCODES, validate_bch
+
+
+class BitcoinCash(BitcoinGeneric):
+    CCY = 'bch'
+    FEE = settings.BITCOIN_CASH_FEE
+    FEE_ESTIMATE = ('estimatefee',)
+    URL = settings.BITCOIN_CASH_URL
+    WALLET_URL = settings.BITCOIN_CASH_WALLET_URL
+    NETCODES = NETCODES['btc']
+    NET_WALLETS = {'mainnet': 'btc', 'testnet': 'btctest'}
+    KEY_CLASSES = {'mainnet': PrivateKey, 'testnet': PrivateKeyTestnet}
+
+    validate_addr = staticmethod(validate_bch)
+
+    def __init__(self, config=None, **kwargs):
+        super().__init__(config, **kwargs)
+        self.KEY_CLASS = self.KEY_CLASSES[self.NETWORK]
+
+    async def build_tx(
+        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True,
+        coin_selection: str = None
+    ):
+        # Todo: Need to break this up.
+        key = self.KEY_CLASS(priv)
+        addr_from = self.to_legacy_address(key.address)
+        unspent_obj_list = await self._get_obj_unspent_list(addr_from)
+
+        payables = [
+            (self.to_legacy_address(addr), amount * COIN)
+            for addr, amount in addrs
+        ]
+        total_out = sum(amount for addr, amount in payables)
+        # the recipients pay the fee
+        unspent_obj_list = self.select_coins(
+            unspent_obj_list,
+            int(total_out),
+            await self.get_fee_rate(),
+            len(addrs),
+            coin_selection,
+            value=attrgetter('amount'),
+            subtract_fee=True,
+        ).inputs
+        total_unspent = sum(D(unspent.amount) for unspent in unspent_obj_list)
+        remaining = total_unspent - total_out
+
+        fee = await self.calc_fee(len(unspent_obj_list), len(addrs))
+        fee_per_tx_out, extra_count = divmod(fee, len(addrs))
+
+        calc_addrs = []
+        for addr, amount in payables:
+            amount -= fee_per_tx_out
+            if extra_count > 0:
+                amount -= 1
+            if amount < 1:
+                raise NotEnoughAmountError()
+            calc_addrs.append((addr, int(amount)))
+        remaining = int(remaining)
+        # dust change is left to the fee
+        if remaining >= self.DUST_LIMIT:
+            calc_addrs.append((addr_from, remaining))
+
+        return create_p2pkh_transaction(key, unspent_obj_list, calc_addrs)
+
+    def sign_tx(self, priv, tx):
+        return tx
+
+    async def sign(self, priv, tx):
+        # bitcash signs the transaction when building it
+        return tx
+
+    async def broadcast_tx(self, tx):
+        tx_id = await self.post('sendrawtransaction', tx)
+        if tx_id and self.utxo_cache:
+            self.utxo_cache.apply_tx(Tx.from_hex(tx))
+        return tx_id
+
+    async def get_balance(self, addr):
+        unspent_list = await self.get_raw_unspent_list(addr)
+        d = D(str(sum(
+            D(str(unspent['amount'])) for unspent in unspent_list
+        )))
+        return self.normalize_decimal(d)
+
+    async def get_balances(self, addrs: Sequence[str]) -> Dict[str, D]:
+        unspent_lists = await self.get_raw_unspent_lists(addrs)
+        balances = {}
+        for addr in addrs:
+            unspent_list = unspent_lists.get(self.normalize_addr(addr), ())
+            d = D(str(sum(
+                D(str(unspent['amount'])) for unspent in unspent_list
+            )))
+            balances[addr] = self.normalize_decimal(d)
+        return balances
+
+    def normalize_addr(self, addr):
+        return self.to_legacy_address(addr)
+
+    def create_addr(self):
+        key = self.KEY_CLASS()
+        return self.to_legacy_address(key.address), to_string(key.to_wif())
+
+    async def calc_fee(self, n_in, n_out):
+        return await super().calc_fee(self.estimate_tx_size(n_in, n_out))
+
+    async def _get_obj_unspent_list(self, addr):
+        unspent_list = await self.get_raw_unspent_list(addr)
+        return [
+            Unspent(
+                int(D(str(unspent['amount'])) * COIN),
+                unspent['confirmations'],
+                unspent['scriptPubKey'],
+                unspent['txid'],
+                unspent['vout']
+            )
+            for unspent in unspent_list
+        ]
+
+    def to_legacy_address(self, addr):
+        return to_string(to_legacy_address(addr))
+
+    @staticmethod
+    def normalize_decimal(d):
+        return d.to_integral() if d == d.to_integral() else d.normalize()
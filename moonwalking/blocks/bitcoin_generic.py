@@ -1,40 +1,117 @@
-import io
-from typing import List, Tuple
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from operator import attrgetter
+from typing import Dict, List, Sequence, Tuple, Union
 from binascii import unhexlify
 from decimal import Decimal as D
 
-from aiohttp import ClientSession
-
-from bitcoin import SelectParams
 from bitcoin.core import COIN, lx, COutPoint
 from bitcoin.core.script import CScript
-from bitcoin.wallet import CBitcoinAddress
 
 from pycoin.key import Key
 from pycoin.tx.Tx import Tx
+from pycoin.tx.exceptions import SolvingError
 from pycoin.tx.Spendable import Spendable
 from pycoin.tx.TxOut import TxOut
-from pycoin.tx.tx_utils import sign_tx
+from pycoin.tx.tx_utils import LazySecretExponentDB, sign_tx
 from pycoin.ui import standard_tx_out_script
 
 from pywallet.wallet import create_wallet
 
+from .. import settings
 from .base import BaseBlock
-from .exc import NotEnoughAmountError
+from .coinselect import DUST_LIMIT, Selection, select_coins
+from .exc import AddressImportError, NotEnoughAmountError
+from .fee import NodeSmartFee
+from .importer import AddressImporter
+from .txsize import (
+    P2PKH, TX_FIXED, TxSize, estimate_size_for, input_size, output_size,
+    tx_size
+)
+from .utxo import UtxoCache
+from .validate import netcode_validator
+from ..utils import chunks
+
+logger = logging.getLogger(__name__)
 
 
 def to_string(v):
     return v.decode('utf-8') if isinstance(v, bytes) else v
 
 
-class BitcoinGeneric(BaseBlock):
-    NETWORK = None
-    URL = None
-    NETCODE = None
-    NET_WALLET = None
+def sign_tx_inputs(
+    tx_hex: str, wif: str, indexes: Sequence[int]
+) -> List[Tuple[int, bytes, list]]:
+    """Sign some inputs of a transaction serialized with its unspents
+
+    Runs in executor workers, the signed inputs are returned as
+    (index, script, witness) to be merged back into the transaction.
+    """
+    tx = Tx.from_hex(tx_hex)
+    secret_exponent_db = LazySecretExponentDB([wif], {})
+    signed = []
+    for i in indexes:
+        unspent = tx.unspents[i]
+        if not unspent or tx.txs_in[i].is_coinbase():
+            continue
+        try:
+            tx.sign_tx_in(secret_exponent_db, i, unspent.script)
+        except SolvingError:
+            continue
+        signed.append((i, tx.txs_in[i].script, tx.txs_in[i].witness))
+    return signed
 
-    def __init__(self):
-        SelectParams(self.NETWORK)
+
+class BitcoinGeneric(BaseBlock):
+    # pycoin netcodes and pywallet networks by network
+    NETCODES: Dict[str, str] = None
+    NET_WALLETS: Dict[str, str] = None
+    LISTUNSPENT_SIZE = 1000
+    FEE_ESTIMATE = ('estimatesmartfee', 2)
+    COIN_SELECTION = settings.COIN_SELECTION
+    DUST_LIMIT = DUST_LIMIT  # satoshi
+    INPUT_TYPE = P2PKH
+    OUTPUT_TYPE = P2PKH
+    SIGN_SHARD_SIZE = int(settings.SIGN_SHARD_SIZE)
+    IMPORT_WINDOW = int(settings.IMPORT_WINDOW)  # ms
+    IMPORT_BATCH_SIZE = int(settings.IMPORT_BATCH_SIZE)
+    WRITE_METHODS = frozenset((
+        'generate',
+        'importaddress',
+        'importmulti',
+        'sendrawtransaction',
+        'sendtoaddress',
+    ))
+    BROADCAST_METHODS = frozenset(('sendrawtransaction',))
+    # the addresses are imported in the wallet of a single node
+    WALLET_METHODS = frozenset((
+        'generate',
+        'importaddress',
+        'importmulti',
+        'listsinceblock',
+        'listunspent',
+        'sendtoaddress',
+    ))
+    HEIGHT_METHOD = 'getblockcount'
+
+    def __init__(self, config=None, **kwargs):
+        super().__init__(config, **kwargs)
+        self.NETCODE = self.NETCODES[self.NETWORK]
+        self.NET_WALLET = self.NET_WALLETS[self.NETWORK]
+        # testnet blocks accept mainnet addresses as well
+        networks = (
+            ('testnet', 'mainnet') if self.NETWORK == 'testnet'
+            else ('mainnet',)
+        )
+        self.address_validator = netcode_validator(*(
+            self.NETCODES[network] for network in networks
+        ))
+        self.utxo_cache = UtxoCache(self) if settings.UTXO_CACHE else None
+        self.importer = AddressImporter(
+            self, self.IMPORT_WINDOW / 1000, self.IMPORT_BATCH_SIZE
+        )
 
     def get_data(self, method, *params):
         return {
@@ -44,11 +121,8 @@ class BitcoinGeneric(BaseBlock):
             'id': self.NETWORK
         }
 
-    async def post(self, *args):
-        async with ClientSession() as sess:
-            async with sess.post(self.URL, json=self.get_data(*args)) as res:
-                resp_dict = await res.json()
-                return resp_dict['result']
+    def validate_addr(self, addr):
+        return self.address_validator(addr)
 
     def create_addr(self):
         wallet = create_wallet(self.NET_WALLET)
@@ -56,16 +130,59 @@ class BitcoinGeneric(BaseBlock):
 
     async def create_wallet(self):
         addr, pk = self.create_addr()
-        await self.post('importaddress', addr, '', False)
+        if self.IMPORT_WINDOW:
+            await self.importer.add(addr)
+        else:
+            await self.post('importaddress', addr, '', False)
         return addr, pk
 
+    async def create_wallets(self, n):
+        wallets = [self.create_addr() for _ in range(n)]
+        await self.import_addresses([addr for addr, _ in wallets])
+        return wallets
+
+    async def import_addresses(self, addrs: Sequence[str]):
+        """Watch addrs without rescanning the chain
+
+        They are sent IMPORT_BATCH_SIZE at a time to importmulti.
+
+        :raise AddressImportError: with the addresses the node refused
+        """
+        results = await self.post_many([
+            ('importmulti', [
+                {
+                    'scriptPubKey': {'address': addr},
+                    'timestamp': 'now',
+                    'watchonly': True,
+                    'label': '',
+                }
+                for addr in chunk
+            ], {'rescan': False})
+            for chunk in chunks(addrs, self.IMPORT_BATCH_SIZE)
+        ])
+        errors = {
+            addr: result.get('error')
+            for addr, result in zip(
+                addrs, (result for chunk in results for result in chunk)
+            )
+            if not result.get('success')
+        }
+        if errors:
+            raise AddressImportError(data=errors)
+
+    async def get_raw_unspent_list(self, addr, confirmations=1):
+        if self.utxo_cache and confirmations == 1:
+            return await self.utxo_cache.get(addr)
+        return await self.post(
+            'listunspent', confirmations, 9999999, [self.normalize_addr(addr)]
+        )
+
     async def get_listunspent_for_addr(self, addr, confirmations=1):
-        res = await self.post('listunspent', confirmations, 9999999, [addr])
+        res = await self.get_raw_unspent_list(addr, confirmations)
         for unspent in res:
             coutpoint = COutPoint(lx(unspent['txid']), unspent['vout'])
             cscript = CScript(unhexlify(unspent['scriptPubKey']))
             unspent['outpoint'] = coutpoint
-            unspent['address'] = CBitcoinAddress(unspent['address'])
             unspent['scriptPubKey'] = cscript
             unspent['amount'] = int(D(str(unspent['amount'])) * COIN)
         return res
@@ -86,17 +203,100 @@ class BitcoinGeneric(BaseBlock):
         unspent_list = await self.get_listunspent_for_addr(addr)
         return D(sum(unspent['amount'] for unspent in unspent_list)) / COIN
 
-    def calc_fee(self, tx: Tx) -> D:
-        raise NotImplementedError
+    def normalize_addr(self, addr: str) -> str:
+        return addr
 
-    @staticmethod
-    def calculate_tx_size(tx: Tx) -> int:
-        s = io.BytesIO()
-        tx.stream(s)
-        return len(s.getvalue())
+    async def get_raw_unspent_lists(
+        self, addrs: Sequence[str], confirmations=1
+    ) -> Dict[str, List[dict]]:
+        if self.utxo_cache and confirmations == 1:
+            return await self.utxo_cache.get_many(addrs)
+        return await self.fetch_raw_unspent_lists(addrs, confirmations)
+
+    async def fetch_raw_unspent_lists(
+        self, addrs: Sequence[str], confirmations=1
+    ) -> Dict[str, List[dict]]:
+        """Unspent outputs of many addresses grouped by address
+
+        Addresses are sent LISTUNSPENT_SIZE at a time to listunspent and
+        all the chunks go to the node with post_many.
+        """
+        addrs = list(dict.fromkeys(self.normalize_addr(a) for a in addrs))
+        calls = [
+            ('listunspent', confirmations, 9999999, chunk)
+            for chunk in chunks(addrs, self.LISTUNSPENT_SIZE)
+        ]
+        unspent_lists = defaultdict(list)
+        for res in await self.post_many(calls):
+            for unspent in res or ():
+                addr = self.normalize_addr(unspent['address'])
+                unspent_lists[addr].append(unspent)
+        return unspent_lists
+
+    async def get_balances(self, addrs: Sequence[str]) -> Dict[str, D]:
+        unspent_lists = await self.get_raw_unspent_lists(addrs)
+        return {
+            addr: D(sum(
+                int(D(str(unspent['amount'])) * COIN)
+                for unspent in unspent_lists.get(self.normalize_addr(addr), ())
+            )) / COIN
+            for addr in addrs
+        }
+
+    def get_fee_sources(self):
+        sources = super().get_fee_sources()
+        sources['node'] = NodeSmartFee(self, *self.FEE_ESTIMATE)
+        return sources
+
+    async def get_fee_rate(self) -> int:
+        """Fee in satoshi per byte"""
+        fee = await self.fee_station.get_fee()
+        return min(self.MAX_FEE, fee) if self.MAX_FEE else fee
+
+    async def calc_fee(self, tx: Union[Tx, TxSize]) -> int:
+        """Fee of a transaction or of an estimated transaction size"""
+        if isinstance(tx, TxSize):
+            tx_vsize = tx.vsize
+        else:
+            tx_vsize = self.calculate_tx_size(tx)
+        return await self.get_fee_rate() * tx_vsize
+
+    def calculate_tx_size(self, tx: Tx) -> int:
+        return tx_size(tx, self.INPUT_TYPE).vsize
+
+    def estimate_tx_size(self, n_in: int, n_out: int) -> TxSize:
+        return estimate_size_for(
+            n_in, n_out, self.INPUT_TYPE, self.OUTPUT_TYPE
+        )
+
+    def select_coins(
+        self, coins, target, fee_rate, n_outputs, strategy=None, value=None,
+        subtract_fee=False
+    ) -> Selection:
+        in_base, in_witness = input_size(self.INPUT_TYPE)
+        selection = select_coins(
+            coins,
+            target,
+            fee_rate,
+            strategy=strategy or self.COIN_SELECTION,
+            value=value or attrgetter('coin_value'),
+            n_outputs=n_outputs,
+            input_size=in_base + math.ceil(in_witness / 4),
+            output_size=output_size(self.OUTPUT_TYPE),
+            overhead=TX_FIXED + 2 + (1 if in_witness else 0),
+            subtract_fee=subtract_fee,
+            dust_limit=self.DUST_LIMIT,
+        )
+        logger.debug(
+            '%s coin selection: %d of %d inputs, change %d, waste %d',
+            self.CCY, len(selection.inputs), len(coins),
+            selection.change, selection.waste
+        )
+        return selection
 
     async def build_tx(
-        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True
+        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True,
+        coin_selection: str = None
     ):
         """
         We distribute fee equally on every recipient by reducing the amount
@@ -105,12 +305,26 @@ class BitcoinGeneric(BaseBlock):
 
         :param priv: WIF private key of sender -> str
         :param addrs: distribution -> [(addr1, amount1), (addr2, amount2),...]
+        :param coin_selection: coin selection strategy, defaults to
+            COIN_SELECTION
         :return: transaction id -> str
         """
         addr = Key.from_text(priv).address()
 
         spendables = await self.get_spendable_list_for_addr(addr)
-        addrs.append((addr, D(0)))
+        # when the fee is split the recipients pay for it
+        selection = self.select_coins(
+            spendables,
+            int(sum(amount for _, amount in addrs) * COIN),
+            await self.get_fee_rate(),
+            len(addrs),
+            coin_selection,
+            subtract_fee=split_fee,
+        )
+        spendables = selection.inputs
+        addrs = list(addrs)
+        if selection.change:
+            addrs.append((addr, D(0)))
 
         txs_out = []
         for payable in addrs:
@@ -131,9 +345,12 @@ class BitcoinGeneric(BaseBlock):
             for spendable in tx.unspents
         )
         coins_allocated = sum(tx_out.coin_value for tx_out in tx.txs_out)
+        change_out = tx.txs_out[-1] if selection.change else None
 
         if split_fee:
-            fee_per_tx_out, extra_count = divmod(fee, len(tx.txs_out) - 1)
+            fee_per_tx_out, extra_count = divmod(
+                fee, len(tx.txs_out) - bool(change_out)
+            )
 
             if coins_allocated > total_coin_value:
                 raise NotEnoughAmountError(
@@ -143,7 +360,7 @@ class BitcoinGeneric(BaseBlock):
                 )
 
             for tx_out in tx.txs_out:
-                if tx_out.address(netcode=self.NETCODE) == addr:
+                if tx_out is change_out:
                     tx_out.coin_value = total_coin_value - coins_allocated
                 else:
                     tx_out.coin_value -= fee_per_tx_out
@@ -163,17 +380,45 @@ class BitcoinGeneric(BaseBlock):
                     f'fee: {fee}, '
                     f'spendable: {total_coin_value}'
                 )
-            for tx_out in tx.txs_out:
-                if tx_out.address(netcode=self.NETCODE) == addr:
-                    tx_out.coin_value = (
-                        total_coin_value - coins_allocated - fee
-                    )
-                    break
+            if change_out:
+                change_out.coin_value = (
+                    total_coin_value - coins_allocated - fee
+                )
+                if change_out.coin_value < self.DUST_LIMIT:
+                    # left to the fee
+                    tx.txs_out.pop()
         return tx
 
     def sign_tx(self, priv, tx):
         sign_tx(tx, wifs=[priv])
         return tx
 
+    async def sign(self, priv, tx):
+        """Sign tx in the block executor
+
+        Inputs are signed SIGN_SHARD_SIZE at a time in parallel, which
+        pays off with a process pool on transactions with many inputs.
+        """
+        if self.executor is None:
+            return self.sign_tx(priv, tx)
+        tx.check_unspents()
+        tx_hex = tx.as_hex(include_unspents=True)
+        loop = asyncio.get_event_loop()
+        shards = await asyncio.gather(*(
+            loop.run_in_executor(
+                self.executor, sign_tx_inputs, tx_hex, priv, indexes
+            )
+            for indexes in chunks(range(len(tx.txs_in)), self.SIGN_SHARD_SIZE)
+        ))
+        for signed in shards:
+            for i, script, witness in signed:
+                tx.txs_in[i].script = script
+                if witness:
+                    tx.set_witness(i, witness)
+        return tx
+
     async def broadcast_tx(self, tx):
-        return await self.post('sendrawtransaction', tx.as_hex())
+        tx_id = await self.post('sendrawtransaction', tx.as_hex())
+        if tx_id and self.utxo_cache:
+            self.utxo_cache.apply_tx(tx)
+        return tx_id
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, List, NamedTuple, Sequence
+
+from aiohttp import ClientError
+
+from .. import settings
+from .exc import ReplacementTransactionError
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (ClientError, asyncio.TimeoutError, OSError)
+
+Reprice = Callable[[int], Awaitable[Any]]
+
+
+class BroadcastStatus(NamedTuple):
+    tx: Any
+    tx_id: str = None
+    error: Exception = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Broadcaster:
+    """Send a list of raw transactions and report on each of them
+
+    The transactions go to the node as one JSON-RPC batch, or several
+    when there are more than BATCH_SIZE of them. Failed ones are then
+    retried on their own, at most ``concurrency`` at a time:
+
+    * transport errors after a jittered exponential backoff
+    * :class:`.ReplacementTransactionError` with the transaction
+      returned by ``reprice``, when one is given
+
+    Any other error is final. A failure never stops the other
+    transactions from going out.
+    """
+    def __init__(
+        self, block, method: str,
+        retries: int = int(settings.BROADCAST_RETRIES),
+        backoff: float = int(settings.BROADCAST_BACKOFF) / 1000,
+        max_backoff: float = int(settings.BROADCAST_MAX_BACKOFF) / 1000,
+        concurrency: int = None,
+    ):
+        self.block = block
+        self.method = method
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.concurrency = concurrency or block.CONCURRENCY
+
+    async def broadcast(
+        self, txs: Sequence, reprice: Reprice = None
+    ) -> List[BroadcastStatus]:
+        """Status of every transaction, in the order of txs
+
+        :param reprice: coroutine function taking the index of a
+            transaction and returning it signed with a higher fee
+        """
+        try:
+            results = await self.block.post_many(
+                [(self.method, tx) for tx in txs], return_exceptions=True
+            )
+        except TRANSIENT_ERRORS as exc:
+            results = [exc] * len(txs)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(
+            self.settle(i, tx, result, reprice, semaphore)
+            for i, (tx, result) in enumerate(zip(txs, results))
+        ))
+
+    async def settle(self, index, tx, result, reprice, semaphore):
+        attempts = 1
+        while isinstance(result, Exception):
+            error = result
+            tx_id = self.block.get_known_tx_id(tx, error)
+            if tx_id:
+                # an earlier attempt made it to the node
+                return BroadcastStatus(tx, tx_id, None, attempts)
+            if attempts > self.retries:
+                break
+            if isinstance(error, ReplacementTransactionError) and reprice:
+                try:
+                    tx = await reprice(index)
+                except Exception as exc:
+                    logger.warning('could not reprice transaction: %s', exc)
+                    break
+            elif isinstance(error, TRANSIENT_ERRORS):
+                await asyncio.sleep(self.get_delay(attempts))
+            else:
+                break
+            async with semaphore:
+                try:
+                    result = await self.block.post(self.method, tx)
+                except Exception as exc:
+                    result = exc
+            attempts += 1
+        else:
+            return BroadcastStatus(tx, result, None, attempts)
+        logger.warning(
+            '%s broadcast failed after %d attempts: %r',
+            self.block.CCY, attempts, error
+        )
+        return BroadcastStatus(tx, None, error, attempts)
+
+    def get_delay(self, attempts: int) -> float:
+        """Full jitter backoff"""
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+        )
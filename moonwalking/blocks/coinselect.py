@@ -0,0 +1,271 @@
+"""Coin selection
+
+Pick the unspent outputs funding a transaction. Amounts are integers in
+the smallest unit of the coin and fee rates are per byte.
+
+* ``bnb`` - branch and bound search for an input set needing no change,
+  falls back to ``knapsack`` when there is none
+* ``knapsack`` - stochastic approximation of the smallest input set
+  covering the target, as done by bitcoin core
+* ``largest_first`` - biggest outputs until the target is covered
+* ``all`` - spend every output, consolidating the wallet
+"""
+import random
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from .exc import NotEnoughAmountError
+from .txsize import TX_FIXED, input_size, output_size
+
+TX_OVERHEAD = TX_FIXED + 2
+INPUT_SIZE = input_size()[0]
+OUTPUT_SIZE = output_size()
+BNB_MAX_TRIES = 100000
+# smallest change output worth creating, smaller change goes to the fee
+DUST_LIMIT = 546
+KNAPSACK_ITERATIONS = 1000
+
+
+class Selection(NamedTuple):
+    inputs: list
+    value: int
+    fee: int
+    change: int
+    waste: int
+
+
+def branch_and_bound(
+    values: Sequence[int], target: int, cost_of_change: int,
+    max_tries: int = BNB_MAX_TRIES
+) -> Optional[List[int]]:
+    """Indexes of the values adding up to between target and
+    target + cost_of_change with the least excess, None if there are none
+    """
+    pool = sorted(
+        (i for i, v in enumerate(values) if v > 0),
+        key=lambda i: values[i],
+        reverse=True,
+    )
+    available = sum(values[i] for i in pool)
+    if available < target:
+        return None
+    curr_value = 0
+    curr_selection: List[bool] = []
+    best_selection = None
+    best_waste = None
+    for _ in range(max_tries):
+        backtrack = False
+        if (
+            curr_value + available < target or
+            curr_value > target + cost_of_change
+        ):
+            backtrack = True
+        elif curr_value >= target:
+            waste = curr_value - target
+            if best_waste is None or waste <= best_waste:
+                best_selection = list(curr_selection)
+                best_waste = waste
+                if not waste:
+                    break
+            backtrack = True
+
+        if backtrack:
+            # walk back to the last included value and exclude it
+            while curr_selection and not curr_selection[-1]:
+                curr_selection.pop()
+                available += values[pool[len(curr_selection)]]
+            if not curr_selection:
+                break
+            curr_selection[-1] = False
+            curr_value -= values[pool[len(curr_selection) - 1]]
+        else:
+            depth = len(curr_selection)
+            value = values[pool[depth]]
+            available -= value
+            if (
+                curr_selection and not curr_selection[-1] and
+                value == values[pool[depth - 1]]
+            ):
+                # same as the excluded sibling, nothing new to explore
+                curr_selection.append(False)
+            else:
+                curr_selection.append(True)
+                curr_value += value
+
+    if best_selection is None:
+        return None
+    return [pool[i] for i, included in enumerate(best_selection) if included]
+
+
+def approximate_best_subset(
+    values: Sequence[int], target: int,
+    iterations: int = KNAPSACK_ITERATIONS, rng: random.Random = None
+) -> List[bool]:
+    rng = rng or random.Random()
+    total = sum(values)
+    best = [True] * len(values)
+    best_value = total
+    for _ in range(iterations):
+        if best_value == target:
+            break
+        included = [False] * len(values)
+        curr_value = 0
+        reached_target = False
+        for npass in range(2):
+            if reached_target:
+                break
+            for i, value in enumerate(values):
+                # the first pass picks at random, the second fills the
+                # gaps left by the first
+                pick = rng.random() < 0.5 if npass == 0 else not included[i]
+                if pick:
+                    curr_value += value
+                    included[i] = True
+                    if curr_value >= target:
+                        reached_target = True
+                        if curr_value < best_value:
+                            best_value = curr_value
+                            best = list(included)
+                        curr_value -= value
+                        included[i] = False
+    return best
+
+
+def knapsack(
+    values: Sequence[int], target: int, rng: random.Random = None
+) -> Optional[List[int]]:
+    """Indexes of a small set of values covering target, None if the
+    values do not add up to target
+    """
+    lower = []
+    lowest_larger = None
+    for i, value in enumerate(values):
+        if value == target:
+            return [i]
+        elif value < target:
+            lower.append(i)
+        elif lowest_larger is None or value < values[lowest_larger]:
+            lowest_larger = i
+
+    lower_total = sum(values[i] for i in lower)
+    if lower_total == target:
+        return lower
+    if lower_total < target:
+        return None if lowest_larger is None else [lowest_larger]
+
+    lower.sort(key=lambda i: values[i], reverse=True)
+    included = approximate_best_subset(
+        [values[i] for i in lower], target, rng=rng
+    )
+    best = [i for i, inc in zip(lower, included) if inc]
+    best_total = sum(values[i] for i in best)
+    if (
+        lowest_larger is not None and
+        best_total != target and
+        values[lowest_larger] <= best_total
+    ):
+        return [lowest_larger]
+    return best
+
+
+def largest_first(
+    values: Sequence[int], target: int
+) -> Optional[List[int]]:
+    selected = []
+    total = 0
+    for i in sorted(range(len(values)), key=lambda i: -values[i]):
+        if total >= target:
+            break
+        selected.append(i)
+        total += values[i]
+    return selected if total >= target else None
+
+
+def select_coins(
+    coins: Sequence,
+    target: int,
+    fee_rate: int = 0,
+    strategy: str = 'bnb',
+    value: Callable = None,
+    n_outputs: int = 1,
+    long_term_fee_rate: int = None,
+    input_size: int = INPUT_SIZE,
+    output_size: int = OUTPUT_SIZE,
+    overhead: int = TX_OVERHEAD,
+    subtract_fee: bool = False,
+    dust_limit: int = DUST_LIMIT,
+) -> Selection:
+    """Select the coins paying target to n_outputs at fee_rate
+
+    Sizes are in virtual bytes and default to P2PKH inputs and outputs.
+
+    :param coins: candidate unspent outputs
+    :param value: function returning the value of a coin
+    :param long_term_fee_rate: fee rate expected when inputs are spent
+        later on, the waste of a selection accounts for spending inputs
+        now rather than at this rate
+    :param subtract_fee: the outputs pay the fee out of target, the coins
+        only cover target
+    :param dust_limit: smallest change output, the excess goes to the
+        fee below it
+    :raises NotEnoughAmountError: when the coins cannot cover the target
+    """
+    value = value or (lambda coin: coin)
+    if long_term_fee_rate is None:
+        long_term_fee_rate = fee_rate
+    input_fee = fee_rate * input_size
+    change_fee = fee_rate * output_size
+    cost_of_change = change_fee + long_term_fee_rate * input_size
+    base_fee = fee_rate * (overhead + n_outputs * output_size)
+    values = [value(coin) for coin in coins]
+    if subtract_fee:
+        effective = values
+        selection_target = target
+        # the outputs pay the fee of the change output too
+        change_target = 0
+    else:
+        effective = [v - input_fee for v in values]
+        selection_target = target + base_fee
+        change_target = change_fee
+
+    indexes = None
+    if strategy == 'all':
+        indexes = list(range(len(coins)))
+    elif strategy == 'largest_first':
+        indexes = largest_first(effective, selection_target + change_target)
+    elif strategy in ('bnb', 'knapsack'):
+        if strategy == 'bnb':
+            indexes = branch_and_bound(
+                effective, selection_target, cost_of_change
+            )
+        if indexes is None:
+            indexes = knapsack(
+                effective, selection_target + change_target
+            )
+    else:
+        raise ValueError(f'Unknown coin selection strategy {strategy}')
+
+    selected_value = sum(values[i] for i in indexes or ())
+    fee = base_fee + input_fee * len(indexes or ())
+    paid_fee = 0 if subtract_fee else fee
+    if indexes is None or selected_value < target + paid_fee:
+        raise NotEnoughAmountError(
+            'Coins available do not cover the amount: '
+            f'amount: {target}, fee: {fee}, available: {sum(values)}'
+        )
+
+    excess = selected_value - target - paid_fee
+    waste = (fee_rate - long_term_fee_rate) * input_size * len(indexes)
+    change = excess - change_target
+    if excess > cost_of_change and change >= dust_limit:
+        fee += change_fee
+        waste += cost_of_change
+    else:
+        change = 0
+        waste += excess
+    return Selection(
+        inputs=[coins[i] for i in indexes],
+        value=selected_value,
+        fee=fee,
+        change=change,
+        waste=waste,
+    )
@@ -0,0 +1,42 @@
+from typing import NamedTuple, Optional, Tuple
+
+NETWORKS = ('mainnet', 'testnet')
+
+
+class BlockConfig(NamedTuple):
+    """Node endpoints, network and policies of a block instance
+
+    Blocks built from different configs coexist in a process, e.g. a
+    testnet and a mainnet block of the same currency. The defaults of a
+    block class come from settings, see :meth:`.BaseBlock.default_config`.
+    """
+    urls: Tuple[str, ...] = ()
+    network: str = 'mainnet'
+    # chain id signed into ethereum transactions
+    chain_id: Optional[int] = None
+    # static fee and fee cap, in the units of the block
+    fee: Optional[str] = None
+    max_fee: Optional[int] = None
+    fee_sources: Tuple[str, ...] = ()
+    pool_size: int = 100
+    batch_size: int = 500
+    coalesce_window: int = 0  # ms
+    coalesce_size: int = 100
+    concurrency: int = 8
+    # balancing, health probes every probe_interval seconds and the
+    # blocks a node may lag behind, with several urls
+    balancing: str = 'least_outstanding'
+    probe_interval: int = 30  # s
+    max_lag: int = 3
+    # node of the wallet calls, the first of urls when not set
+    wallet_url: Optional[str] = None
+    # ethereum token, Multicall and disperse contracts and the key of
+    # the wallet topping up new token wallets
+    contract_addr: Optional[str] = None
+    multicall_addr: Optional[str] = None
+    disperse_addr: Optional[str] = None
+    buffer_priv: Optional[str] = None
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.urls[0] if self.urls else None
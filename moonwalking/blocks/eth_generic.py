@@ -1,34 +1,179 @@
+import asyncio
 import logging
-from decimal import Decimal as D
-from typing import List, Tuple
+import math
+import warnings
+from decimal import Context, Decimal as D
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
 
-from aiohttp.client import ClientSession
-
-from eth_abi.abi import decode_abi
 from eth_account import Account
+from eth_account.signers.local import LocalAccount
 from eth_hash.auto import keccak
-from eth_utils import from_wei, to_checksum_address, is_address
+from eth_utils import from_wei, to_checksum_address
 from eth_utils.currency import to_wei
 
 from hexbytes.main import HexBytes
 
 from .. import settings
+from .broadcast import Broadcaster
 from .exc import (
-    EthereumError, ReplacementTransactionError, NotEnoughAmountError
+    BroadcastError, EthereumError, ReplacementTransactionError,
+    NotEnoughAmountError
+)
+from .nonce import NonceManager, get_nonce_manager
+from .fee import (
+    EthGasStationApi, NodeFeeHistory, NodeGasPrice, StaticFee
 )
-from .fee import FeeStation
+from .abi import ContractABI
 from .base import BaseBlock
+from .config import BlockConfig
+from .validate import validate_eth
+from ..utils import LRUCache, chunks
 
 logger = logging.getLogger(__name__)
 DECIMALS = pow(10, 18)
+# uint256 values have up to 78 digits
+UINT256_CONTEXT = Context(prec=78)
+# (node url, lower case address) -> whether there is code at the address
+CONTRACTS = LRUCache(int(settings.CONTRACT_CACHE_SIZE))
+DISPERSE_ABI = ContractABI([{
+    'name': 'disperseToken',
+    'type': 'function',
+    'inputs': [
+        {'name': 'token', 'type': 'address'},
+        {'name': 'recipients', 'type': 'address[]'},
+        {'name': 'values', 'type': 'uint256[]'},
+    ],
+    'outputs': [],
+}, {
+    'name': 'disperseEther',
+    'type': 'function',
+    'inputs': [
+        {'name': 'recipients', 'type': 'address[]'},
+        {'name': 'values', 'type': 'uint256[]'},
+    ],
+    'outputs': [],
+}])
+MULTICALL_ABI = ContractABI([{
+    'name': 'aggregate',
+    'type': 'function',
+    'inputs': [{
+        'name': 'calls',
+        'type': 'tuple[]',
+        'components': [
+            {'name': 'target', 'type': 'address'},
+            {'name': 'callData', 'type': 'bytes'},
+        ],
+    }],
+    'outputs': [
+        {'name': 'blockNumber', 'type': 'uint256'},
+        {'name': 'returnData', 'type': 'bytes[]'},
+    ],
+}])
+
+
+@lru_cache(maxsize=None)
+def get_lnd_abi() -> ContractABI:
+    return ContractABI(settings.lnd_contract()['abi'])
+
+
+def from_token_units(value: int, decimals: int = 18) -> D:
+    """Exact amount of a balance in the smallest unit of a token"""
+    return D(value).scaleb(-decimals, UINT256_CONTEXT)
+
+
+def get_account(priv) -> LocalAccount:
+    """Account of a private key
+
+    Deriving the address costs a scalar multiplication, accounts are
+    passed through as they are so that it is done once per call.
+    """
+    if isinstance(priv, LocalAccount):
+        return priv
+    return Account.privateKeyToAccount(priv)
+
+
+def sign_transactions(
+    private_key: bytes, tx_dicts: Sequence[dict]
+) -> List[str]:
+    """Raw transactions of tx_dicts signed with one key
+
+    Runs in executor workers, the key is parsed once for the batch.
+    """
+    account = Account.privateKeyToAccount(private_key)
+    return [
+        account.signTransaction(tx_dict).rawTransaction.hex()
+        for tx_dict in tx_dicts
+    ]
+
+
+def get_error_message(error: Exception) -> str:
+    """Message of the node error behind an EthereumError"""
+    if isinstance(error, EthereumError):
+        message = ((error.data or {}).get('error') or {}).get('message')
+        return message or ''
+    return ''
+
+
+def is_nonce_too_low(error: Exception) -> bool:
+    return 'nonce too low' in get_error_message(error)
+
+
+def is_rejected(error: Exception) -> bool:
+    """Whether the node turned the transaction down, leaving its nonce
+    free
+    """
+    return isinstance(error, EthereumError) and not is_nonce_too_low(error)
 
 
 class EthereumGeneric(BaseBlock):
-    MAX_FEE = 100
+    MAX_FEE = 100  # gwei
+    FEE = settings.ETH_FEE  # gwei
+    FEE_API = EthGasStationApi
+    FEE_CCY = 'eth'
     URL = settings.ETH_URL
-    NETWORK = 'testnet' if settings.USE_TESTNET else 'mainnet'
+    # chain ids by network, used when the config gives none
+    CHAIN_IDS = {'mainnet': 1, 'testnet': int(settings.ETH_CHAIN_ID)}
     MIN_GAS = 21000
+    CONTRACT_GAS = 50000
     MAX_GAS = 100000
+    ESTIMATE_GAS = settings.ETH_ESTIMATE_GAS
+    GAS_ESTIMATE_MARGIN = int(settings.GAS_ESTIMATE_MARGIN)  # %
+    CONTRACT_ABI: ContractABI = None  # LND token when not set
+    CONTRACT_ADDR = settings.LND_CONTRACT_ADDR
+    MULTICALL_ADDR = settings.MULTICALL_ADDR
+    DISPERSE_ADDR = None
+    BUFFER_PRIV = settings.BUFFER_ETH_PRIV
+    MULTICALL_SIZE = int(settings.MULTICALL_SIZE)
+    # geth replaces a pending transaction for a 10% higher gas price
+    REPRICE_BUMP = D('1.125')
+    NONCE_MANAGER = settings.NONCE_MANAGER
+    WRITE_METHODS = frozenset((
+        'eth_sendRawTransaction',
+        'eth_sendTransaction',
+    ))
+    BROADCAST_METHODS = frozenset(('eth_sendRawTransaction',))
+    # pending transactions may not have reached the other nodes yet
+    PINNED_METHODS = frozenset(('eth_getTransactionCount',))
+    HEIGHT_METHOD = 'eth_blockNumber'
+
+    def __init__(self, config=None, **kwargs):
+        super().__init__(config, **kwargs)
+        if self.CHAIN_ID is None:
+            self.CHAIN_ID = self.CHAIN_IDS[self.NETWORK]
+        self.CONTRACT_ADDR = self.config.contract_addr
+        self.MULTICALL_ADDR = self.config.multicall_addr
+        self.DISPERSE_ADDR = self.config.disperse_addr
+        self.BUFFER_PRIV = self.config.buffer_priv
+
+    @classmethod
+    def default_config(cls) -> BlockConfig:
+        return super().default_config()._replace(
+            contract_addr=cls.CONTRACT_ADDR,
+            multicall_addr=cls.MULTICALL_ADDR,
+            disperse_addr=cls.DISPERSE_ADDR,
+            buffer_priv=cls.BUFFER_PRIV,
+        )
 
     def get_data(self, method, *params):
         return {
@@ -38,63 +183,75 @@ class EthereumGeneric(BaseBlock):
             'id': self.NETWORK
         }
 
-    async def post(self, *args):
-        async with ClientSession() as sess:
-            async with sess.post(self.URL, json=self.get_data(*args)) as res:
-                resp_dict = await res.json()
-                result = resp_dict.get('result')
-                error = resp_dict.get('error')
-                if error:
-                    message = error.get('message')
-                    if message == 'replacement transaction underpriced':
-                        raise ReplacementTransactionError
-                    raise EthereumError(data=resp_dict)
-                return result
+    def get_result(self, resp_dict):
+        result = resp_dict.get('result')
+        error = resp_dict.get('error')
+        if error:
+            message = error.get('message')
+            if message == 'replacement transaction underpriced':
+                raise ReplacementTransactionError
+            raise EthereumError(data=resp_dict)
+        return result
+
+    def get_fee_sources(self):
+        sources = super().get_fee_sources()
+        sources['node'] = NodeGasPrice(self)
+        sources['history'] = NodeFeeHistory(self)
+        if self.FEE:
+            sources['static'] = StaticFee(to_wei(int(self.FEE), 'gwei'))
+        return sources
 
     async def get_gas_price(self) -> int:
-        if not settings.ETH_FEE:
-            fee_station = FeeStation('eth')
-            transaction_fee = await fee_station.get_fee()
-            return min(self.MAX_FEE, transaction_fee)
-        return to_wei(int(settings.ETH_FEE), 'gwei')
+        gas_price = await self.fee_station.get_fee()
+        return min(to_wei(self.MAX_FEE, 'gwei'), gas_price)
 
     async def get_eth_balance(self, addr):
         balance = await self.post('eth_getBalance', addr, 'latest')
         return D(from_wei(int(balance, 16), 'ether'))
 
+    async def get_eth_balances(self, addrs: Sequence[str]) -> Dict[str, D]:
+        balances = await self.post_many([
+            ('eth_getBalance', addr, 'latest') for addr in addrs
+        ])
+        return {
+            addr: D(from_wei(int(balance, 16), 'ether'))
+            for addr, balance in zip(addrs, balances)
+        }
+
+    def get_gas_for_code(self, code):
+        return self.CONTRACT_GAS if len(code) > 3 else self.MIN_GAS
+
     async def get_transaction_dict(self, priv, addr_to, amount, nonce, data,
-                                   subtract_fee):
-        if data:  # Pull this out.
-            gas = self.MAX_GAS
-        else:
-            get_code = await self.post('eth_getCode', addr_to, 'latest')
-            gas = 50000 if len(get_code) > 3 else self.MIN_GAS
+                                   subtract_fee, gas=None, gas_price=None):
+        if gas is None:
+            gas, = await self.get_gas_limits(
+                [(addr_to, amount, data)], get_account(priv).address
+            )
 
-        gas_price = await self.get_gas_price()
+        if gas_price is None:
+            gas_price = await self.get_gas_price()
         amount = to_wei(amount, 'ether')
         if subtract_fee:
             fee = gas * gas_price
             amount -= fee
         return {
-            'from': Account.privateKeyToAccount(priv).address,
+            'from': get_account(priv).address,
             'to': addr_to,
             'value': amount,
             'gas': gas,
             'gasPrice': gas_price,
             'data': data,
-            'chainId': int(settings.ETH_CHAIN_ID),
+            'chainId': self.CHAIN_ID,
             'nonce': nonce
         }
 
     def make_lnd_transfer_data(self, addr_to, amount):
-        # Todo: Generalise to any contract.
-        method_hash = self.get_method_hash('transfer')
-        addr_hash = self.get_addr_hash(addr_to)
-        amount_hash = self.get_amount_hash(amount)
-        return method_hash + addr_hash + amount_hash
+        return self.contract_abi.encode(
+            'transfer', addr_to, int(amount * DECIMALS)
+        )
 
     async def validate_balance(self, priv, addrs):
-        addr_from = Account.privateKeyToAccount(priv).address
+        addr_from = get_account(priv).address
         balance = await self.get_eth_balance(addr_from)
         total_amount = sum(amount for addr, amount in addrs)
         if total_amount > balance:
@@ -105,96 +262,352 @@ class EthereumGeneric(BaseBlock):
                                 'pending')
         return int(nonce, 16)
 
-    def validate_addr(self, addr):
-        if is_address(addr):
-            return addr
+    @property
+    def contract_abi(self) -> ContractABI:
+        return self.CONTRACT_ABI or get_lnd_abi()
+
+    @property
+    def nonce_manager(self) -> NonceManager:
+        return get_nonce_manager(self) if self.NONCE_MANAGER else None
+
+    async def get_nonces(
+        self, addr_from, count, contiguous=False
+    ) -> List[int]:
+        if self.nonce_manager:
+            return await self.nonce_manager.allocate(
+                addr_from, count, contiguous
+            )
+        nonce = await self.get_transaction_count(addr_from)
+        return list(range(nonce, nonce + count))
+
+    def release_nonces(self, tx: List[dict]):
+        if self.nonce_manager and tx:
+            self.nonce_manager.release(
+                tx[0]['from'], [tx_dict['nonce'] for tx_dict in tx]
+            )
+
+    async def reclaim_nonces(self, tx: List[dict], statuses):
+        """Release the nonces of the transactions the node rejected
+
+        The node may hold the others, timed out or still underpriced
+        after repricing, or had seen higher nonces already. Their nonces
+        are not given out again, the pending count of the node is read
+        instead.
+        """
+        if not self.nonce_manager:
+            return
+        failed = [
+            (tx_dict, status.error)
+            for tx_dict, status in zip(tx, statuses) if not status.ok
+        ]
+        self.release_nonces([
+            tx_dict for tx_dict, error in failed if is_rejected(error)
+        ])
+        if any(not is_rejected(error) for _, error in failed):
+            try:
+                await self.nonce_manager.resync(tx[0]['from'])
+            except Exception:
+                logger.exception('could not resync the nonces of %s',
+                                 tx[0]['from'])
+
+    validate_addr = staticmethod(validate_eth)
 
     def create_addr(self):
         account = Account().create()
         return account.address, account.privateKey.hex()
 
-    @staticmethod
-    def get_contract_addr():
+    def get_contract_addr(self):
         """
         to make tests mocking easier
         """
-        return to_checksum_address(settings.LND_CONTRACT_ADDR)
+        return to_checksum_address(self.CONTRACT_ADDR)
 
     def get_method_hash(self, method):
-        method_sig = self.get_method_signature(method)
-        if method_sig:
-            return '0x' + keccak(method_sig.encode()).hex()[:8]
+        return self.contract_abi[method].selector
 
     @staticmethod
     def get_addr_hash(addr):
+        warnings.warn(
+            "get_addr_hash is deprecated, encode the call with contract_abi",
+            DeprecationWarning, stacklevel=2,
+        )
         if addr.startswith('0x'):
             return addr.lower()[2:].zfill(64)
         return ''
 
     @staticmethod
     def get_amount_hash(num):
+        warnings.warn(
+            "get_amount_hash is deprecated, encode the call with contract_abi",
+            DeprecationWarning, stacklevel=2,
+        )
         return hex(int(num * DECIMALS))[2:].zfill(64)
 
-    @staticmethod
-    def get_method_signature(method_name):
-        method_abi = next(x for x in settings.LND_CONTRACT['abi']
-                          if x.get('name') == method_name)
-        args = ','.join(i['type'] for i in method_abi.get('inputs', ()))
-        return f'{method_name}({args})'
+    def get_method_signature(self, method_name):
+        return self.contract_abi[method_name].signature
+
+    async def call_many(
+        self, calls: Sequence[Tuple[str, str]], block='latest'
+    ) -> List[bytes]:
+        """Return data of many eth_calls
+
+        Calls are aggregated MULTICALL_SIZE at a time through the
+        Multicall contract at MULTICALL_ADDR when there is one, and sent
+        with post_many otherwise.
+
+        :param calls: [(contract address, hex data), ...]
+        """
+        if not self.MULTICALL_ADDR:
+            results = await self.post_many([
+                ('eth_call', {'to': to, 'data': data}, block)
+                for to, data in calls
+            ])
+            return [bytes(HexBytes(result)) for result in results]
+        multicall = to_checksum_address(self.MULTICALL_ADDR)
+        aggregate = MULTICALL_ABI['aggregate']
+        results = await self.post_many([
+            ('eth_call', {
+                'to': multicall,
+                'data': aggregate.encode(
+                    [(to, bytes(HexBytes(data))) for to, data in chunk]
+                ),
+            }, block)
+            for chunk in chunks(calls, self.MULTICALL_SIZE)
+        ])
+        return [
+            data
+            for result in results
+            for data in aggregate.decode(result)[1]
+        ]
 
-    async def call_contract_method(self, method, to_int=False,
+    async def call_contract_method(self, method, *args, to_int=False,
                                    to_string=False):
-        contract_address = self.get_contract_addr()
+        function = self.contract_abi[method]
         result = await self.post('eth_call', {
-            'to': contract_address,
-            'data': self.get_method_hash(method)
+            'to': self.get_contract_addr(),
+            'data': function.encode(*args)
         }, 'latest')
         if to_int:
-            return int(result, 16)
+            return int(function.decode(result)[0])
         elif to_string:
-            return decode_abi(['string'], HexBytes(result))[0].decode()
+            value = function.decode(result)[0]
+            return value.decode() if isinstance(value, bytes) else value
         return result
 
+    async def send_money(
+        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True,
+        **kwargs
+    ):
+        account = get_account(priv)
+        tx = await self.build_tx(account, addrs, split_fee, **kwargs)
+        return await self.send_tx_dicts(account, tx)
+
     async def send_eth(self, priv, addrs):
-        tx = await EthereumGeneric.build_tx(self, priv, addrs)
-        signed = self.sign_tx(priv, tx)
-        return await self.broadcast_tx(signed)
+        account = get_account(priv)
+        tx = await EthereumGeneric.build_tx(self, account, addrs)
+        return await self.send_tx_dicts(account, tx)
+
+    async def send_tx_dicts(self, account, tx: List[dict]) -> List[str]:
+        """Sign and broadcast tx, repricing the transactions replacing
+        a pending one
+        """
+        try:
+            signed = await self.sign(account, tx)
+        except Exception:
+            self.release_nonces(tx)
+            raise
+
+        async def reprice(index):
+            tx[index] = await self.reprice_tx_dict(tx[index])
+            signed = await self.sign(account, [tx[index]])
+            return signed[0]
+
+        try:
+            return await self.broadcast_tx(signed, reprice)
+        except BroadcastError as exc:
+            await self.reclaim_nonces(tx, exc.data)
+            raise
+
+    async def reprice_tx_dict(self, tx_dict: dict) -> dict:
+        gas_price = max(
+            int(tx_dict['gasPrice'] * self.REPRICE_BUMP),
+            await self.get_gas_price(),
+        )
+        if gas_price > to_wei(self.MAX_FEE, 'gwei'):
+            raise ReplacementTransactionError
+        value = tx_dict['value']
+        if not tx_dict['data']:
+            # plain transfers pay their fee out of the amount
+            value -= tx_dict['gas'] * (gas_price - tx_dict['gasPrice'])
+        return dict(tx_dict, gasPrice=gas_price, value=value)
 
     async def send_all_eth_to_buffer_wallet(self, priv):
-        addr = Account.privateKeyToAccount(priv).address
-        buffer_addr = Account.privateKeyToAccount(
-            settings.BUFFER_ETH_PRIV
-        ).address
-        balance = await self.get_eth_balance(addr)
-        return await self.send_eth(priv, [(buffer_addr, balance)])
+        account = get_account(priv)
+        buffer_addr = get_account(self.BUFFER_PRIV).address
+        balance = await self.get_eth_balance(account.address)
+        return await self.send_eth(account, [(buffer_addr, balance)])
 
-    async def build_tx(
-        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True
-    ):
-        await self.validate_balance(priv, addrs)
-        addr_from = Account.privateKeyToAccount(priv).address
-        nonce = await self.get_transaction_count(addr_from)
+    async def is_contract_many(self, addrs: Sequence[str]) -> Dict[str, bool]:
+        """Whether there is code at each address
+
+        Results are kept in an LRU cache, code of the addresses not in it
+        is fetched with post_many.
+        """
+        result = {}
+        missing = []
+        for addr in dict.fromkeys(addrs):
+            is_contract = CONTRACTS.get((self.URL, addr.lower()))
+            if is_contract is None:
+                missing.append(addr)
+            else:
+                result[addr] = is_contract
+        codes = await self.post_many([
+            ('eth_getCode', addr, 'latest') for addr in missing
+        ])
+        for addr, code in zip(missing, codes):
+            result[addr] = self.get_gas_for_code(code) != self.MIN_GAS
+            CONTRACTS[(self.URL, addr.lower())] = result[addr]
+        return result
+
+    async def estimate_gas_many(
+        self, addr_from: str, payments: Sequence[Tuple[str, D, str]]
+    ) -> List[int]:
+        """eth_estimateGas of payments plus GAS_ESTIMATE_MARGIN, MAX_GAS
+        for the ones the node cannot estimate
+        """
+        estimates = await self.post_many([
+            ('eth_estimateGas', {
+                'from': addr_from,
+                'to': addr_to,
+                'value': hex(to_wei(amount, 'ether')),
+                'data': data,
+            })
+            for addr_to, amount, data in payments
+        ], return_exceptions=True)
+        gas_limits = []
+        for estimate in estimates:
+            if isinstance(estimate, Exception):
+                logger.warning('could not estimate gas: %r', estimate)
+                gas_limits.append(self.MAX_GAS)
+            else:
+                gas_limits.append(math.ceil(
+                    int(estimate, 16) * (100 + self.GAS_ESTIMATE_MARGIN) / 100
+                ))
+        return gas_limits
+
+    async def get_gas_limits(
+        self, payments: Sequence[Tuple[str, D, str]], addr_from: str = None
+    ) -> List[int]:
+        """Gas of each payment
+
+        Plain transfers take MIN_GAS, or CONTRACT_GAS when paying a
+        contract. Contract calls are estimated when ESTIMATE_GAS is set
+        and the sender is known, they take MAX_GAS otherwise.
+        """
+        calls = [payment for payment in payments if payment[2]]
+        transfers = [addr_to for addr_to, _, data in payments if not data]
+        if calls and addr_from and self.ESTIMATE_GAS:
+            estimates, contracts = await asyncio.gather(
+                self.estimate_gas_many(addr_from, calls),
+                self.is_contract_many(transfers),
+            )
+        else:
+            estimates = [self.MAX_GAS] * len(calls)
+            contracts = await self.is_contract_many(transfers)
+        estimates = iter(estimates)
+        return [
+            next(estimates) if data else (
+                self.CONTRACT_GAS if contracts[addr_to] else self.MIN_GAS
+            )
+            for addr_to, _, data in payments
+        ]
+
+    async def build_tx_dicts(
+        self, priv, payments: Sequence[Tuple[str, D, str]], subtract_fee,
+        gas_limits: Sequence[int] = None, contiguous: bool = False
+    ) -> List[dict]:
+        """Transactions for payments
+
+        The gas price and the gas limits, unless given, are fetched
+        concurrently, once for the whole list, the nonces are taken last.
+
+        :param payments: [(addr_to, ether amount, data), ...]
+        :param contiguous: whether the nonces must follow each other, so
+            that no other transaction of the sender runs in between
+        """
+        account = get_account(priv)
+        if gas_limits is None:
+            gas_price, gas_limits = await asyncio.gather(
+                self.get_gas_price(),
+                self.get_gas_limits(payments, account.address),
+            )
+        else:
+            gas_price = await self.get_gas_price()
+        nonces = await self.get_nonces(
+            account.address, len(payments), contiguous
+        )
         return [
             (await self.get_transaction_dict(
-                priv,
-                addr,
+                account,
+                addr_to,
                 amount,
-                nonce + i,
-                '',
-                subtract_fee=True,
+                nonce,
+                data,
+                subtract_fee=subtract_fee,
+                gas=gas,
+                gas_price=gas_price,
                 ))
-            for i, (addr, amount) in enumerate(addrs)
+            for (addr_to, amount, data), gas, nonce in zip(
+                payments, gas_limits, nonces
+            )
         ]
 
+    async def build_tx(
+        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True
+    ):
+        account = get_account(priv)
+        balance_error, tx = await asyncio.gather(
+            self.validate_balance(account, addrs),
+            self.build_tx_dicts(
+                account,
+                [(addr, amount, '') for addr, amount in addrs],
+                subtract_fee=True,
+            ),
+            return_exceptions=True,
+        )
+        if balance_error is not None:
+            if not isinstance(tx, Exception):
+                self.release_nonces(tx)
+            raise balance_error
+        if isinstance(tx, Exception):
+            raise tx
+        return tx
+
     def sign_tx(self, priv, tx):
-        return [
-            Account.signTransaction(tx_dict, priv).rawTransaction.hex()
-            for tx_dict in tx
-        ]
+        return sign_transactions(get_account(priv).privateKey, tx)
 
-    async def broadcast_tx(self, tx):
-        # Todo: Retries.
-        return [
-            (await self.post('eth_sendRawTransaction', tx_hex))
-            for tx_hex in tx
-        ]
+    async def sign(self, priv, tx):
+        """Sign the whole list of transactions in the block executor"""
+        return await self.run_in_executor(
+            sign_transactions, get_account(priv).privateKey, tx
+        )
+
+    async def broadcast_tx(self, tx, reprice=None):
+        """Send the signed transactions, see :class:`.Broadcaster`
+
+        :raise BroadcastError: when any of them failed, with the status of
+            every transaction
+        """
+        statuses = await Broadcaster(self, 'eth_sendRawTransaction').broadcast(
+            tx, reprice
+        )
+        if not all(status.ok for status in statuses):
+            raise BroadcastError(data=statuses)
+        return [status.tx_id for status in statuses]
+
+    def get_known_tx_id(self, tx, error):
+        message = get_error_message(error)
+        if message == 'already known' or message.startswith(
+            'known transaction'
+        ):
+            return '0x' + keccak(HexBytes(tx)).hex()
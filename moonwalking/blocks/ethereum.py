@@ -0,0 +1,206 @@
+import asyncio
+from decimal import Decimal as D
+from typing import Dict, List, Sequence, Tuple
+
+from eth_utils import from_wei, to_checksum_address, to_wei
+
+from .. import settings
+from .eth_generic import (
+    DECIMALS, DISPERSE_ABI, EthereumGeneric, from_token_units, get_account
+)
+from .exc import NotEnoughAmountError
+from .nonce import get_nonce_manager
+from ..utils import GeneralError, chunks
+
+
+class Ethereum(EthereumGeneric):
+    CCY = 'eth'
+
+    async def get_balance(self, addr):
+        return await self.get_eth_balance(addr)
+
+    async def get_balances(self, addrs: Sequence[str]) -> Dict[str, D]:
+        return await self.get_eth_balances(addrs)
+
+    async def create_wallet(self):
+        return self.create_addr()
+
+
+class Lendingblock(EthereumGeneric):
+    CCY = 'lnd'
+    LND_WALLETS_TOPUP_TRANS_NO = int(settings.LND_WALLETS_TOPUP_TRANS_NO)
+    DISPERSE_ADDR = settings.DISPERSE_CONTRACT_ADDR
+    DISPERSE_MAX_GAS = int(settings.DISPERSE_MAX_GAS)
+    # gas of a disperseToken call and of each token transfer it makes
+    DISPERSE_GAS = 50000
+    DISPERSE_TRANSFER_GAS = 40000
+
+    async def get_balance(self, addr):
+        balances = await self.get_balances([addr])
+        return balances[addr]
+
+    async def get_balances(self, addrs: Sequence[str]) -> Dict[str, D]:
+        balance_of = self.contract_abi['balanceOf']
+        contract_addr = self.get_contract_addr()
+        results = await self.call_many([
+            (contract_addr, balance_of.encode(addr)) for addr in addrs
+        ])
+        return {
+            addr: from_token_units(int.from_bytes(result, 'big'))
+            for addr, result in zip(addrs, results)
+        }
+
+    async def create_wallet(self):
+        wallets = await self.create_wallets(1)
+        return wallets[0]
+
+    async def create_wallets(self, n):
+        """New wallets topped up with enough ether from the buffer wallet
+        for LND_WALLETS_TOPUP_TRANS_NO transactions
+        """
+        wallets = [self.create_addr() for _ in range(n)]
+        await self.fund_wallets(wallets)
+        return wallets
+
+    async def create_pooled_wallets(self, n):
+        """Bare keys, pooled ether would be lost with the process"""
+        return [self.create_addr() for _ in range(n)]
+
+    async def fund_wallets(self, wallets):
+        """Top up wallets from the buffer wallet
+
+        The top ups are sent together, in as few disperseEther calls as
+        possible when there is a disperse contract.
+        """
+        price = await self.get_gas_price()
+        single_tx_price = price * self.MAX_GAS
+        single_tx_price = from_wei(single_tx_price, 'ether')
+        amount = single_tx_price * self.LND_WALLETS_TOPUP_TRANS_NO
+        try:
+            await self.send_eth(
+                self.BUFFER_PRIV,
+                [(addr, amount) for addr, _ in wallets],
+            )
+        except NotEnoughAmountError:
+            raise GeneralError("not enough eth in buffer wallet")
+
+    async def send_eth(self, priv, addrs):
+        if not self.DISPERSE_ADDR or len(addrs) < 2:
+            return await super().send_eth(priv, addrs)
+        account = get_account(priv)
+        await self.validate_balance(account, addrs)
+        disperse_addr = to_checksum_address(self.DISPERSE_ADDR)
+        payments = [
+            (
+                disperse_addr,
+                sum(amount for _, amount in chunk),
+                DISPERSE_ABI.encode(
+                    'disperseEther',
+                    [addr for addr, _ in chunk],
+                    [to_wei(amount, 'ether') for _, amount in chunk],
+                ),
+                self.DISPERSE_GAS + self.DISPERSE_TRANSFER_GAS * len(chunk),
+            )
+            for chunk in chunks(addrs, self.get_disperse_size())
+        ]
+        tx = await self.build_tx_dicts(
+            account,
+            [payment[:3] for payment in payments],
+            subtract_fee=False,
+            gas_limits=[payment[3] for payment in payments],
+        )
+        return await self.send_tx_dicts(account, tx)
+
+    def get_disperse_size(self) -> int:
+        """Recipients per disperse call"""
+        return max(
+            1,
+            (self.DISPERSE_MAX_GAS - self.DISPERSE_GAS) //
+            self.DISPERSE_TRANSFER_GAS
+        )
+
+    async def build_tx(
+        self, priv: str, addrs: List[Tuple[str, D]], split_fee=True,
+        disperse: bool = True
+    ):
+        """Token transfers paying addrs
+
+        With a disperse contract at DISPERSE_ADDR the recipients are paid
+        by as few disperseToken calls as fit DISPERSE_MAX_GAS, preceded by
+        an approve call of the total. Otherwise, or when disperse is
+        false, there is a transfer per recipient.
+
+        The approve and the disperseToken calls take contiguous nonces
+        under the send lock of the sender, so that the calls of another
+        payout from the same wallet never spend or replace the allowance
+        in between.
+        """
+        contract_addr = self.get_contract_addr()
+        if disperse and self.DISPERSE_ADDR:
+            account = get_account(priv)
+            async with self.get_send_lock(account.address):
+                payments = await self.get_disperse_payments(account, addrs)
+                return await self.build_tx_dicts(
+                    account,
+                    [payment[:3] for payment in payments],
+                    subtract_fee=False,
+                    gas_limits=[payment[3] for payment in payments],
+                    contiguous=True,
+                )
+        return await self.build_tx_dicts(
+            priv,
+            [
+                (contract_addr, 0, self.make_lnd_transfer_data(addr, amount))
+                for addr, amount in addrs
+            ],
+            subtract_fee=False,
+        )
+
+    def get_send_lock(self, addr: str) -> asyncio.Lock:
+        """Lock of the disperse payouts of addr, shared by the blocks
+        of the node
+        """
+        return get_nonce_manager(self).get_send_lock(addr)
+
+    async def get_disperse_payments(
+        self, priv, addrs: List[Tuple[str, D]]
+    ) -> List[Tuple[str, int, str, int]]:
+        """(addr_to, 0, data, gas) of the approve and disperseToken
+        calls paying addrs
+
+        The calls of the earlier payouts spend their own allowance before
+        these run, the allowance is set to the total, and reset to 0 first
+        when some is left since many tokens reject changing a nonzero
+        allowance.
+        """
+        contract_addr = self.get_contract_addr()
+        disperse_addr = to_checksum_address(self.DISPERSE_ADDR)
+        values = [
+            (addr, int(amount * DECIMALS)) for addr, amount in addrs
+        ]
+        total = sum(value for _, value in values)
+        payments = []
+        allowance = await self.call_contract_method(
+            'allowance', get_account(priv).address, disperse_addr,
+            to_int=True,
+        )
+        for value in ((0, total) if allowance else (total,)):
+            payments.append((
+                contract_addr,
+                0,
+                self.contract_abi.encode('approve', disperse_addr, value),
+                self.MAX_GAS,
+            ))
+        for chunk in chunks(values, self.get_disperse_size()):
+            payments.append((
+                disperse_addr,
+                0,
+                DISPERSE_ABI.encode(
+                    'disperseToken',
+                    contract_addr,
+                    [addr for addr, _ in chunk],
+                    [value for _, value in chunk],
+                ),
+                self.DISPERSE_GAS + self.DISPERSE_TRANSFER_GAS * len(chunk),
+            ))
+        return payments
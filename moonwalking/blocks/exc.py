@@ -16,3 +16,24 @@ class ReplacementTransactionError(Exception):
 
 class NotEnoughAmountError(BlockBaseError):
     error = 'not_enough_amount'
+
+
+class FeeError(BlockBaseError):
+    error = 'fee_unavailable'
+
+
+class AddressImportError(BlockBaseError):
+    """The node did not import some addresses, data maps them to the
+    error of the node
+    """
+    error = 'address_import_failed'
+
+
+class BroadcastError(EthereumError):
+    """Some transactions were not accepted, data is the list of
+    :class:`.BroadcastStatus` of all of them
+
+    A transaction still underpriced after repricing shows up as the
+    ReplacementTransactionError of its status.
+    """
+    error = 'broadcast_failed'
@@ -1,45 +1,177 @@
-from datetime import datetime, timedelta
+import asyncio
+import logging
+import math
+import time
+from decimal import Decimal as D
+from typing import List
 
-from aiohttp import ClientSession
+from .. import settings
+from .exc import FeeError
+from .session import get_session
 
-from eth_utils.currency import to_wei
+logger = logging.getLogger(__name__)
 
-from .. import settings
+SATOSHIS = 100000000
+GWEI = 1000000000  # wei
+
+
+async def get_json(url):
+    async with get_session(url).get(url) as resp:
+        return await resp.json()
+
+
+class FeeSource:
+    """A place to get the current fee from
+
+    Bitcoin-family fees are in satoshi per byte, ethereum ones are gas
+    prices in wei.
+    """
+    async def get_fee(self) -> int:
+        raise NotImplementedError
+
+
+class StaticFee(FeeSource):
+
+    def __init__(self, fee: int):
+        self.fee = fee
+
+    async def get_fee(self):
+        return self.fee
+
+
+class BitcoinFeesApi(FeeSource):
+    URL = 'https://bitcoinfees.earn.com/api/v1/fees/recommended'
+
+    async def get_fee(self):
+        resp_dict = await get_json(self.URL)
+        return int(resp_dict['fastestFee'])
+
+
+class EthGasStationApi(FeeSource):
+    URL = 'https://ethgasstation.info/json/ethgasAPI.json'
+
+    async def get_fee(self):
+        resp_dict = await get_json(self.URL)
+        average = int(resp_dict['average'] / 10)
+        return average * GWEI
+
+
+class NodeSmartFee(FeeSource):
+    """Fee rate estimated by a bitcoin-family node
+
+    ``estimatesmartfee`` and ``estimatefee`` both answer in coins per
+    kilobyte, either as a number or in the ``feerate`` field.
+    """
+    def __init__(self, block, method='estimatesmartfee', *params):
+        self.block = block
+        self.method = method
+        self.params = params
+
+    async def get_fee(self):
+        res = await self.block.post(self.method, *self.params)
+        feerate = res.get('feerate') if isinstance(res, dict) else res
+        if not feerate or feerate <= 0:
+            raise FeeError(data=res)
+        return max(1, math.ceil(D(str(feerate)) * SATOSHIS / 1000))
+
+
+class NodeGasPrice(FeeSource):
+
+    def __init__(self, block):
+        self.block = block
+
+    async def get_fee(self):
+        return int(await self.block.post('eth_gasPrice'), 16)
+
+
+class NodeFeeHistory(FeeSource):
+    """Base fee of the next block plus the median tip of recent blocks"""
+
+    def __init__(self, block, blocks=10, percentile=50):
+        self.block = block
+        self.blocks = blocks
+        self.percentile = percentile
+
+    async def get_fee(self):
+        res = await self.block.post(
+            'eth_feeHistory', hex(self.blocks), 'latest', [self.percentile]
+        )
+        base_fee = int(res['baseFeePerGas'][-1], 16)
+        tips = sorted(int(reward[0], 16) for reward in res['reward'])
+        return base_fee + (tips[len(tips) // 2] if tips else 0)
 
 
 class FeeStation:
+    """Cached fee lookup, one fetch per currency at any time
 
+    Sources are tried in order and the first fee obtained is cached.
+
+    A cached fee is fresh for FEE_CACHE_TIME minutes. With
+    FEE_STALE_WHILE_REVALIDATE on, an expired fee younger than
+    FEE_CACHE_MAX_AGE minutes is still served while a background task
+    refreshes it.
+    """
     FEE_CACHES = {}
-    BITCOIN_FEE_URL = 'https://bitcoinfees.earn.com/api/v1/fees/recommended'
-    ETH_GAS_PRICE_URL = 'https://ethgasstation.info/json/ethgasAPI.json'
+    FETCHES = {}
+    DEFAULT_SOURCES = {
+        'btc': (BitcoinFeesApi,),
+        'eth': (EthGasStationApi,),
+    }
 
-    def __init__(self, currency):
+    def __init__(
+        self, currency, sources: List[FeeSource] = None, key: str = None
+    ):
         self.currency = currency.lower()
+        # fees are cached by key, the currency unless given
+        self.key = key or self.currency
+        if sources is None:
+            sources = [
+                source() for source in self.DEFAULT_SOURCES[self.currency]
+            ]
+        self.sources = sources
 
     async def get_fee(self):
-        fee, dt = self.FEE_CACHES.get(self.currency, (None, None))
-        valid_till = datetime.utcnow() - timedelta(
-            minutes=int(settings.FEE_CACHE_TIME)
-        )
-        if not fee or dt < valid_till:
-            method = f'get_{self.currency}_fee'
-            value = await getattr(self, method)()
-            self.FEE_CACHES[self.currency] = (value, datetime.utcnow())
-            return value
-        return fee
+        fee, fetched = self.FEE_CACHES.get(self.key, (None, None))
+        if fee is not None:
+            age = time.monotonic() - fetched
+            if age < 60 * int(settings.FEE_CACHE_TIME):
+                return fee
+            if (
+                settings.FEE_STALE_WHILE_REVALIDATE and
+                age < 60 * int(settings.FEE_CACHE_MAX_AGE)
+            ):
+                self.refresh()
+                return fee
+        return await self.refresh()
 
-    @staticmethod
-    async def get(url):
-        async with ClientSession() as session:
-            async with session.get(url) as resp:
-                return await resp.json()
+    def refresh(self) -> asyncio.Future:
+        """Fetch the fee, joining the fetch in flight if there is one"""
+        loop = asyncio.get_event_loop()
+        fetch_loop, task = self.FETCHES.get(self.key, (None, None))
+        if task is None or task.done() or fetch_loop is not loop:
+            task = loop.create_task(self.fetch())
+            task.add_done_callback(self._fetched)
+            self.FETCHES[self.key] = (loop, task)
+        return asyncio.shield(task)
 
-    async def get_btc_fee(self):
-        resp_dict = await self.get(self.BITCOIN_FEE_URL)
-        fatest_fee = int(resp_dict['fastestFee'])
-        return fatest_fee
+    async def fetch(self):
+        for source in self.sources:
+            try:
+                value = await source.get_fee()
+            except Exception as exc:
+                logger.warning(
+                    '%s fee source %s failed: %s',
+                    self.currency, type(source).__name__, exc
+                )
+                continue
+            self.FEE_CACHES[self.key] = (value, time.monotonic())
+            return value
+        raise FeeError(data=self.currency)
 
-    async def get_eth_fee(self):
-        resp_dict = await self.get(self.ETH_GAS_PRICE_URL)
-        average = int(resp_dict['average'] / 10)
-        return to_wei(average, 'gwei')
+    def _fetched(self, task):
+        if self.FETCHES.get(self.key, (None, None))[1] is task:
+            self.FETCHES.pop(self.key)
+        if not task.cancelled() and task.exception():
+            logger.warning(
+                'could not fetch %s fee: %s', self.currency, task.exception()
+            )
@@ -0,0 +1,68 @@
+import asyncio
+from typing import List, Tuple
+
+from .exc import AddressImportError
+
+
+class AddressImporter:
+    """Queue addresses to import into the node wallet
+
+    Addresses added within ``window`` seconds of each other, up to
+    ``max_size`` of them, are imported together with
+    :meth:`.BitcoinGeneric.import_addresses`, which takes the wallet lock
+    once for all of them.
+    """
+    def __init__(self, block, window: float, max_size: int):
+        self.block = block
+        self.window = window
+        self.max_size = max_size
+        self.loop = None
+        self.handle = None
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+
+    async def add(self, addr: str):
+        """Import addr, returns once the batch it is in was imported"""
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.handle = None
+            self.pending = []
+        future = loop.create_future()
+        self.pending.append((addr, future))
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.handle is None:
+            self.handle = loop.call_later(self.window, self.flush)
+        return await asyncio.shield(future)
+
+    def flush(self):
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+        pending, self.pending = self.pending, []
+        if pending:
+            self.loop.create_task(self.send(pending))
+
+    async def send(self, pending):
+        errors = {}
+        try:
+            await self.block.import_addresses(
+                [addr for addr, _ in pending]
+            )
+        except AddressImportError as exc:
+            # only the addresses the node did not import fail
+            errors = exc.data
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for addr, future in pending:
+            if future.done():
+                continue
+            if addr in errors:
+                future.set_exception(
+                    AddressImportError(data={addr: errors[addr]})
+                )
+            else:
+                future.set_result(None)
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import random
+import time
+from typing import List, Optional, Sequence, Set
+
+from aiohttp import ClientError
+
+from .session import close_session, get_session
+
+logger = logging.getLogger(__name__)
+
+# errors of the node itself rather than of the call, the call is retried
+# on another node
+NODE_ERRORS = (ClientError, asyncio.TimeoutError)
+BALANCING = ('least_outstanding', 'latency')
+
+
+class Node:
+    """Endpoint of a block with its load and health"""
+    # weight of the last round trip in the average latency
+    LATENCY_DECAY = 0.2
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.latency = 0.0  # s
+        self.height: Optional[int] = None
+        self.healthy = True
+
+    def __repr__(self):
+        return f'Node({self.url!r})'
+
+    def update_latency(self, elapsed: float):
+        if self.latency:
+            self.latency += self.LATENCY_DECAY * (elapsed - self.latency)
+        else:
+            self.latency = elapsed
+
+
+class NodePool:
+    """Nodes of a block, balancing the calls between them
+
+    Reads go to the healthy node with the fewest calls in flight, or are
+    picked at random weighted by inverse latency, and are retried on
+    another node when the node fails. Calls of ``BROADCAST_METHODS`` go
+    to every node, so that a transaction reaches the network when any of
+    them is up. Other writes and the calls of ``PINNED_METHODS`` are
+    pinned to the first healthy node. Node wallets are not shared, the
+    calls of ``WALLET_METHODS`` only go to the node at ``wallet_url``, the
+    first one when not given, and fail when it is down.
+
+    Every ``interval`` seconds the nodes are probed with ``HEIGHT_METHOD``
+    and those failing it or more than ``max_lag`` blocks behind the best
+    one are left out until they catch up.
+    """
+    def __init__(
+        self, block, urls: Sequence[str],
+        balancing: str = 'least_outstanding',
+        interval: float = 30,
+        max_lag: int = 3,
+        wallet_url: Optional[str] = None,
+    ):
+        assert balancing in BALANCING, f'bad node balancing {balancing}'
+        assert not wallet_url or wallet_url in urls, \
+            f'wallet node {wallet_url} is not one of the nodes'
+        self.block = block
+        self.nodes = [Node(url) for url in urls]
+        self.wallet = next((
+            node for node in self.nodes if node.url == wallet_url
+        ), self.nodes[0] if self.nodes else None)
+        self.balancing = balancing
+        self.interval = interval
+        self.max_lag = max_lag
+        self.loop = None
+        self.task = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def healthy(self) -> List[Node]:
+        """Healthy nodes, all of them when none is"""
+        return [node for node in self.nodes if node.healthy] or self.nodes
+
+    def candidates(self, exclude: Set[Node] = frozenset()) -> List[Node]:
+        """Healthy nodes not in exclude, any of the others if none is"""
+        return (
+            [node for node in self.healthy if node not in exclude] or
+            [node for node in self.nodes if node not in exclude]
+        )
+
+    def pick(self, exclude: Set[Node] = frozenset()) -> Node:
+        nodes = self.candidates(exclude)
+        if self.balancing == 'latency':
+            weights = [1 / (node.latency or 0.001) for node in nodes]
+            return random.choices(nodes, weights)[0]
+        return min(nodes, key=lambda node: (node.outstanding, node.latency))
+
+    def get_methods(self, data) -> Set[str]:
+        calls = data if isinstance(data, list) else [data]
+        return {call['method'] for call in calls}
+
+    async def post_json(self, data):
+        """Send a JSON-RPC call or batch to the nodes it is routed to"""
+        if len(self.nodes) == 1:
+            return await self.post_to(self.nodes[0], data)
+        self.start_probing()
+        methods = self.get_methods(data)
+        if methods & self.block.WALLET_METHODS:
+            return await self.post_to(self.wallet, data)
+        if methods & self.block.BROADCAST_METHODS:
+            return await self.broadcast(data)
+        if methods & (self.block.WRITE_METHODS | self.block.PINNED_METHODS):
+            return await self.post_failover(
+                data, lambda tried: self.candidates(tried)[0]
+            )
+        return await self.post_failover(data, self.pick)
+
+    async def post_failover(self, data, pick):
+        """Send data to the node picked, to the next one if it fails"""
+        tried = set()
+        while True:
+            node = pick(tried)
+            try:
+                return await self.post_to(node, data)
+            except NODE_ERRORS:
+                tried.add(node)
+                if len(tried) == len(self.nodes):
+                    raise
+
+    async def broadcast(self, data):
+        """Send data to all nodes, the first response without a JSON-RPC
+        error, the first one answering if they all have errors
+        """
+        responses = await asyncio.gather(*(
+            self.post_to(node, data) for node in self.nodes
+        ), return_exceptions=True)
+        answers = [
+            response for response in responses
+            if not isinstance(response, Exception)
+        ]
+        if not answers:
+            raise responses[0]
+        return next((
+            response for response in answers if not self.has_error(response)
+        ), answers[0])
+
+    def has_error(self, response) -> bool:
+        calls = response if isinstance(response, list) else [response]
+        return any(call.get('error') for call in calls)
+
+    async def post_to(self, node: Node, data):
+        node.outstanding += 1
+        start = time.monotonic()
+        try:
+            response = await self.send(node, data)
+        except NODE_ERRORS:
+            if len(self.nodes) > 1:
+                node.healthy = False
+            raise
+        finally:
+            node.outstanding -= 1
+        node.update_latency(time.monotonic() - start)
+        return response
+
+    async def send(self, node: Node, data):
+        session = get_session(node.url, self.block.POOL_SIZE, self.block)
+        async with session.post(node.url, json=data) as res:
+            return await res.json()
+
+    async def probe(self):
+        """Check the height of every node against the best one"""
+        heights = await asyncio.gather(*(
+            self.get_height(node) for node in self.nodes
+        ), return_exceptions=True)
+        best = max(
+            (height for height in heights if isinstance(height, int)),
+            default=None,
+        )
+        for node, height in zip(self.nodes, heights):
+            if isinstance(height, Exception):
+                node.height = None
+                node.healthy = False
+                logger.warning('%s node %s is down: %r',
+                               self.block.CCY, node.url, height)
+            else:
+                node.height = height
+                node.healthy = best - height <= self.max_lag
+                if not node.healthy:
+                    logger.warning('%s node %s is %d blocks behind',
+                                   self.block.CCY, node.url, best - height)
+
+    async def get_height(self, node: Node) -> int:
+        response = await self.post_to(
+            node, self.block.get_data(self.block.HEIGHT_METHOD)
+        )
+        height = self.block.get_result(response)
+        return int(height, 16) if isinstance(height, str) else int(height)
+
+    def start_probing(self):
+        loop = asyncio.get_event_loop()
+        if self.task is None or self.task.done() or self.loop is not loop:
+            self.loop = loop
+            self.task = loop.create_task(self.run_probes())
+
+    async def run_probes(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception('could not probe the %s nodes',
+                                 self.block.CCY)
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        """Stop probing and release the sessions of the nodes"""
+        if self.task and self.loop is asyncio.get_event_loop():
+            self.task.cancel()
+        self.task = None
+        for node in self.nodes:
+            await close_session(node.url, self.block)
@@ -0,0 +1,106 @@
+import asyncio
+import heapq
+from typing import Dict, List, Sequence
+
+
+class NonceManager:
+    """Nonces of the transactions sent from each address, kept in process
+
+    The next nonce of an address is read from the node the first time
+    the address sends and handed out locally after that, so concurrent
+    sends from one wallet never get the same nonce. Nonces of
+    transactions that never made it to the node are released and given
+    out again first, so that they do not leave gaps holding back the
+    later transactions.
+
+    Transactions sent from the same address by other processes go
+    unnoticed until the node rejects a nonce as too low and
+    :meth:`resync` is called, only use it for wallets this process owns.
+    """
+    def __init__(self, block):
+        self.block = block
+        self.loop = None
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.send_locks: Dict[str, asyncio.Lock] = {}
+        self.nonces: Dict[str, int] = {}
+        self.released: Dict[str, List[int]] = {}
+
+    def get_lock(self, addr: str) -> asyncio.Lock:
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.locks = {}
+            self.send_locks = {}
+        if addr not in self.locks:
+            self.locks[addr] = asyncio.Lock()
+        return self.locks[addr]
+
+    def get_send_lock(self, addr: str) -> asyncio.Lock:
+        """Lock of the sends of addr depending on the state left by
+        the earlier ones, e.g. an approve and the calls spending it
+        """
+        self.get_lock(addr)
+        if addr not in self.send_locks:
+            self.send_locks[addr] = asyncio.Lock()
+        return self.send_locks[addr]
+
+    async def allocate(
+        self, addr: str, count: int = 1, contiguous: bool = False
+    ) -> List[int]:
+        """Nonces for count transactions of addr, the released ones
+        first unless they must be contiguous
+        """
+        async with self.get_lock(addr):
+            if addr not in self.nonces:
+                self.nonces[addr] = await self.block.get_transaction_count(
+                    addr
+                )
+            released = [] if contiguous else self.released.get(addr) or []
+            nonces = [
+                heapq.heappop(released)
+                for _ in range(min(count, len(released)))
+            ]
+            start = self.nonces[addr]
+            self.nonces[addr] += count - len(nonces)
+            nonces.extend(range(start, self.nonces[addr]))
+            return nonces
+
+    def release(self, addr: str, nonces: Sequence[int]):
+        """Give back nonces of transactions which were not sent"""
+        if addr not in self.nonces:
+            return
+        released = self.released.setdefault(addr, [])
+        for nonce in nonces:
+            if nonce < self.nonces[addr] and nonce not in released:
+                heapq.heappush(released, nonce)
+
+    async def resync(self, addr: str):
+        """Catch up with the node after it rejected a nonce as too low"""
+        async with self.get_lock(addr):
+            count = await self.block.get_transaction_count(addr)
+            self.nonces[addr] = max(self.nonces.get(addr, 0), count)
+            released = [
+                nonce for nonce in self.released.get(addr, ())
+                if nonce >= count
+            ]
+            heapq.heapify(released)
+            self.released[addr] = released
+
+    def reset(self, addr: str = None):
+        """Forget the nonces of addr, or of all addresses"""
+        if addr is None:
+            self.nonces.clear()
+            self.released.clear()
+        else:
+            self.nonces.pop(addr, None)
+            self.released.pop(addr, None)
+
+
+NONCE_MANAGERS: Dict[str, NonceManager] = {}
+
+
+def get_nonce_manager(block) -> NonceManager:
+    """Nonce manager shared by the blocks sending through the same node"""
+    if block.URL not in NONCE_MANAGERS:
+        NONCE_MANAGERS[block.URL] = NonceManager(block)
+    return NONCE_MANAGERS[block.URL]
@@ -0,0 +1,63 @@
+from importlib import import_module
+from typing import Dict, Iterator
+
+
+class BlockRegistry:
+    """Blocks by currency, built on first access
+
+    Blocks are declared by the path of their class, ``module:Class``,
+    and the module, with the libraries of its chain, is only imported
+    when the block is first used. Subclasses of :class:`.BaseBlock` with
+    a ``CCY`` register their class when they are defined.
+    """
+    def __init__(self, paths: Dict[str, str] = None):
+        self.paths: Dict[str, str] = dict(paths or ())
+        self.classes: Dict[str, type] = {}
+        self.blocks: Dict[str, object] = {}
+
+    def declare(self, ccy: str, path: str):
+        self.paths[ccy] = path
+
+    def register(self, cls: type):
+        if cls.CCY in self.classes:
+            raise ValueError(f"Block already there for {cls.CCY}")
+        self.classes[cls.CCY] = cls
+
+    def get_class(self, ccy: str) -> type:
+        if ccy not in self.classes:
+            module, name = self.paths[ccy].split(':')
+            self.classes[ccy] = getattr(import_module(module), name)
+        return self.classes[ccy]
+
+    def create(self, ccy: str, config=None, **kwargs):
+        """New block of ccy from config, next to the shared one"""
+        return self.get_class(ccy)(config, **kwargs)
+
+    def get(self, ccy: str, default=None):
+        try:
+            return self[ccy]
+        except KeyError:
+            return default
+
+    def __getitem__(self, ccy: str):
+        if ccy not in self.blocks:
+            self.blocks[ccy] = self.get_class(ccy)()
+        return self.blocks[ccy]
+
+    def __contains__(self, ccy: str) -> bool:
+        return ccy in self.paths or ccy in self.classes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter({**self.paths, **self.classes})
+
+    def __len__(self) -> int:
+        return len({**self.paths, **self.classes})
+
+
+BLOCKS = BlockRegistry({
+    'btc': 'moonwalking.blocks.bitcoin:Bitcoin',
+    'ltc': 'moonwalking.blocks.bitcoin:Litecoin',
+    'bch': 'moonwalking.blocks.bitcoin_cash:BitcoinCash',
+    'eth': 'moonwalking.blocks.ethereum:Ethereum',
+    'lnd': 'moonwalking.blocks.ethereum:Lendingblock',
+})
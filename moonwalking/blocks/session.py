@@ -0,0 +1,60 @@
+import asyncio
+from typing import Dict, Tuple
+from weakref import WeakSet
+
+from aiohttp import ClientSession, TCPConnector
+
+from .. import settings
+
+
+SESSIONS: Dict[str, Tuple[asyncio.AbstractEventLoop, ClientSession]] = {}
+# blocks using the session of each url
+USERS: Dict[str, WeakSet] = {}
+
+
+def get_session(
+    url: str, pool_size: int = None, user=None
+) -> ClientSession:
+    """Return the long-lived session used for ``url``
+
+    Sessions are shared by every block talking to the same node and are
+    bound to the event loop they were created in, a new one is created
+    when the loop changes or the session was closed.
+
+    :param user: block using the session, it stays open until the last
+        user releases it with :func:`close_session`
+    """
+    loop = asyncio.get_event_loop()
+    session_loop, session = SESSIONS.get(url, (None, None))
+    if session is None or session.closed or session_loop is not loop:
+        connector = TCPConnector(
+            limit=pool_size or int(settings.HTTP_POOL_SIZE),
+            keepalive_timeout=int(settings.HTTP_KEEPALIVE_TIMEOUT),
+        )
+        session = ClientSession(connector=connector)
+        SESSIONS[url] = (loop, session)
+    if user is not None:
+        USERS.setdefault(url, WeakSet()).add(user)
+    return session
+
+
+async def close_session(url: str, user=None):
+    """Close the session of url, once no other block uses it when
+    user is given
+    """
+    if user is not None:
+        users = USERS.get(url)
+        if users is not None:
+            users.discard(user)
+            if users:
+                return
+    USERS.pop(url, None)
+    session_loop, session = SESSIONS.pop(url, (None, None))
+    if session and not session.closed:
+        if session_loop is asyncio.get_event_loop():
+            await session.close()
+
+
+async def close_all():
+    for url in list(SESSIONS):
+        await close_session(url)
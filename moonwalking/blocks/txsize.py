@@ -0,0 +1,168 @@
+"""Transaction size estimation
+
+Sizes are worked out from the number and script types of inputs and
+outputs, so a transaction can be priced before it is built and without
+serializing it. Signatures are counted at their maximum low-S length,
+72 bytes with the hash type, so estimates of unsigned inputs are at
+most one byte per input above the signed size.
+"""
+import math
+from typing import NamedTuple, Sequence
+
+from pycoin.tx.Tx import Tx
+
+P2PKH = 'p2pkh'
+P2SH = 'p2sh'
+P2SH_P2WPKH = 'p2sh_p2wpkh'
+P2WPKH = 'p2wpkh'
+P2WSH = 'p2wsh'
+
+# version + locktime
+TX_FIXED = 8
+# segwit marker and flag
+SEGWIT_MARKER = 2
+# previous outpoint + sequence
+INPUT_FIXED = 40
+SIGNATURE = 72
+PUBKEY = 33
+
+# length of the unlocking script and of the witness of each input type
+INPUT_SCRIPTS = {
+    P2PKH: (1 + SIGNATURE + 1 + PUBKEY, 0),
+    P2SH_P2WPKH: (1 + 22, 1 + 1 + SIGNATURE + 1 + PUBKEY),
+    P2WPKH: (0, 1 + 1 + SIGNATURE + 1 + PUBKEY),
+}
+
+# length of the locking script of each output type
+OUTPUT_SCRIPTS = {
+    P2PKH: 25,
+    P2SH: 23,
+    P2SH_P2WPKH: 23,
+    P2WPKH: 22,
+    P2WSH: 34,
+}
+
+
+class TxSize(NamedTuple):
+    size: int
+    vsize: int
+    weight: int
+
+
+def varint_size(n: int) -> int:
+    if n < 0xfd:
+        return 1
+    if n <= 0xffff:
+        return 3
+    if n <= 0xffffffff:
+        return 5
+    return 9
+
+
+def input_size(script_type: str = P2PKH):
+    """Non witness and witness bytes of an input"""
+    script, witness = INPUT_SCRIPTS[script_type]
+    return INPUT_FIXED + varint_size(script) + script, witness
+
+
+def output_size(script_type: str = P2PKH) -> int:
+    script = OUTPUT_SCRIPTS[script_type]
+    return 8 + varint_size(script) + script
+
+
+def make_size(base: int, witness: int) -> TxSize:
+    if witness:
+        witness += SEGWIT_MARKER
+    weight = 4 * base + witness
+    return TxSize(
+        size=base + witness,
+        vsize=math.ceil(weight / 4),
+        weight=weight,
+    )
+
+
+def estimate_size(
+    inputs: Sequence[str], outputs: Sequence[str]
+) -> TxSize:
+    """Size of a transaction spending inputs into outputs
+
+    :param inputs: script type of every input
+    :param outputs: script type of every output
+    """
+    base = TX_FIXED + varint_size(len(inputs)) + varint_size(len(outputs))
+    witness = 0
+    for script_type in inputs:
+        in_base, in_witness = input_size(script_type)
+        base += in_base
+        # an empty witness is a zero item count
+        witness += in_witness or 1
+    base += sum(output_size(script_type) for script_type in outputs)
+    if witness == len(inputs):
+        witness = 0
+    return make_size(base, witness)
+
+
+def estimate_size_for(
+    n_in: int, n_out: int, input_type: str = P2PKH, output_type: str = P2PKH
+) -> TxSize:
+    """Size of a transaction with inputs and outputs all of one type"""
+    return estimate_size([input_type] * n_in, [output_type] * n_out)
+
+
+def script_type(script: bytes) -> str:
+    """Type of a locking script, None when not a standard one"""
+    n = len(script)
+    if (
+        n == 25 and script[:3] == b'\x76\xa9\x14' and
+        script[23:] == b'\x88\xac'
+    ):
+        return P2PKH
+    if n == 23 and script[:2] == b'\xa9\x14' and script[22:] == b'\x87':
+        return P2SH
+    if n == 22 and script[:2] == b'\x00\x14':
+        return P2WPKH
+    if n == 34 and script[:2] == b'\x00\x20':
+        return P2WSH
+    return None
+
+
+def tx_size(tx: Tx, default_input: str = P2PKH) -> TxSize:
+    """Size of a pycoin transaction without serializing it
+
+    Signed inputs are measured, unsigned ones are estimated from the
+    type of the output they spend, P2SH outputs are taken as wrapped
+    P2WPKH.
+    """
+    base = (
+        TX_FIXED +
+        varint_size(len(tx.txs_in)) +
+        varint_size(len(tx.txs_out))
+    )
+    witness = 0
+    has_witness = False
+    unspents = tx.unspents or ()
+    for i, tx_in in enumerate(tx.txs_in):
+        if tx_in.script or tx_in.witness:
+            script = len(tx_in.script)
+            base += INPUT_FIXED + varint_size(script) + script
+            items = tx_in.witness or ()
+            witness += varint_size(len(items)) + sum(
+                varint_size(len(item)) + len(item) for item in items
+            )
+            has_witness = has_witness or bool(items)
+            continue
+        in_type = None
+        if i < len(unspents) and unspents[i]:
+            in_type = script_type(unspents[i].script)
+            if in_type == P2SH:
+                in_type = P2SH_P2WPKH
+        in_base, in_witness = input_size(
+            in_type if in_type in INPUT_SCRIPTS else default_input
+        )
+        base += in_base
+        witness += in_witness or 1
+        has_witness = has_witness or bool(in_witness)
+    for tx_out in tx.txs_out:
+        script = len(tx_out.script)
+        base += 8 + varint_size(script) + script
+    return make_size(base, witness if has_witness else 0)
@@ -0,0 +1,125 @@
+import logging
+from decimal import Decimal as D
+from typing import Dict, List, Sequence, Tuple
+
+from pycoin.serialize import b2h, b2h_rev
+from pycoin.tx.Tx import Tx
+from pycoin.ui import standard_tx_out_script
+
+logger = logging.getLogger(__name__)
+
+Outpoint = Tuple[str, int]
+
+
+class UtxoCache:
+    """Unspent outputs of the addresses used by a block, kept in process
+
+    An address is loaded with ``listunspent`` the first time it is used.
+    After that the cache is updated incrementally: outputs spent by our
+    transactions are dropped and their change added as soon as they are
+    broadcast, and new deposits are picked up with ``listsinceblock``
+    when the chain tip moves. Entries have the same shape as the raw
+    ``listunspent`` results.
+
+    Outputs spent by transactions the block did not broadcast go
+    unnoticed, only use it for addresses whose keys are not used
+    elsewhere.
+    """
+    # blocks an outpoint we spent is remembered for, so that the output
+    # is not added back while the transaction creating it is reported
+    SPENT_DEPTH = 6
+
+    def __init__(self, block):
+        self.block = block
+        self.utxos: Dict[str, Dict[Outpoint, dict]] = {}
+        self.spent: Dict[Outpoint, int] = {}
+        self.height = None
+        self.last_block = None
+
+    def clear(self):
+        self.utxos.clear()
+        self.spent.clear()
+        self.height = None
+        self.last_block = None
+
+    async def get(self, addr: str) -> List[dict]:
+        unspent_lists = await self.get_many([addr])
+        return unspent_lists[self.block.normalize_addr(addr)]
+
+    async def get_many(self, addrs: Sequence[str]) -> Dict[str, List[dict]]:
+        await self.sync()
+        addrs = [self.block.normalize_addr(addr) for addr in addrs]
+        missing = [addr for addr in addrs if addr not in self.utxos]
+        if missing:
+            unspent_lists = await self.block.fetch_raw_unspent_lists(missing)
+            for addr in missing:
+                self.utxos[addr] = {}
+                for unspent in unspent_lists.get(addr, ()):
+                    self.add(addr, unspent)
+        return {
+            addr: [dict(unspent) for unspent in self.utxos[addr].values()]
+            for addr in addrs
+        }
+
+    def add(self, addr: str, unspent: dict):
+        outpoint = (unspent['txid'], unspent['vout'])
+        if outpoint not in self.spent:
+            self.utxos[addr][outpoint] = unspent
+
+    async def sync(self):
+        height = await self.block.post('getblockcount')
+        if height == self.height:
+            return
+        if self.last_block and self.utxos:
+            try:
+                await self.apply_since_block()
+            except Exception:
+                logger.exception('could not update the UTXO cache')
+                self.clear()
+        if not self.utxos:
+            self.last_block = await self.block.post('getbestblockhash')
+        self.height = height
+        self.spent = {
+            outpoint: spent_height
+            for outpoint, spent_height in self.spent.items()
+            if height - spent_height < self.SPENT_DEPTH
+        }
+
+    async def apply_since_block(self):
+        res = await self.block.post(
+            'listsinceblock', self.last_block, 1, True
+        )
+        for tx in res['transactions']:
+            if tx['category'] != 'receive' or tx['confirmations'] < 1:
+                continue
+            addr = self.block.normalize_addr(tx['address'])
+            if addr in self.utxos:
+                self.add(addr, {
+                    'txid': tx['txid'],
+                    'vout': tx['vout'],
+                    'address': addr,
+                    'amount': tx['amount'],
+                    'confirmations': tx['confirmations'],
+                    'scriptPubKey': b2h(standard_tx_out_script(addr)),
+                })
+        self.last_block = res['lastblock']
+
+    def apply_tx(self, tx: Tx):
+        """Account for a transaction we have just broadcast"""
+        for tx_in in tx.txs_in:
+            outpoint = (b2h_rev(tx_in.previous_hash), tx_in.previous_index)
+            self.spent[outpoint] = self.height or 0
+            for utxos in self.utxos.values():
+                utxos.pop(outpoint, None)
+        txid = tx.id()
+        for vout, tx_out in enumerate(tx.txs_out):
+            addr = tx_out.address(netcode=self.block.NETCODE)
+            if addr in self.utxos and tx_out.coin_value > 0:
+                self.add(addr, {
+                    'txid': txid,
+                    'vout': vout,
+                    'address': addr,
+                    'amount': D(tx_out.coin_value) / 100000000,
+                    'confirmations': 0,
+                    'scriptPubKey': b2h(tx_out.script),
+                })
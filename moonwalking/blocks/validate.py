@@ -0,0 +1,107 @@
+"""Address validation
+
+Decoding an address and checking its checksum is repeated for the same
+addresses over and over, results are kept in bounded LRU caches shared
+by the blocks and :class:`.CcyHelper`.
+
+The validators of the currencies live here rather than on the blocks,
+so that validating an address needs none of the node-side libraries.
+The address library of a chain is imported on its first cache miss.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence
+
+from .. import settings
+
+CACHE_SIZE = int(settings.ADDRESS_CACHE_SIZE)
+
+Validator = Callable[[str], Optional[str]]
+
+_executor = None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def address_netcode(addr: str) -> Optional[str]:
+    """Netcode of a base58 address, None when it is not valid"""
+    from pycoin.key.validate import is_address_valid
+    return is_address_valid(addr)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_cash_address(addr: str) -> bool:
+    """Whether addr is a bitcoin cash address, legacy or cashaddr"""
+    from cashaddress.convert import is_valid
+    return is_valid(addr)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def legacy_address(addr: str) -> str:
+    from cashaddress.convert import to_legacy_address
+    legacy = to_legacy_address(addr)
+    return legacy.decode('utf-8') if isinstance(legacy, bytes) else legacy
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_eth_address(addr: str) -> bool:
+    from eth_utils.address import is_address
+    return is_address(addr)
+
+
+def validate_bch(addr: str) -> Optional[str]:
+    """Legacy form of a bitcoin cash address"""
+    if is_cash_address(addr):
+        return legacy_address(addr)
+
+
+def validate_eth(addr: str) -> Optional[str]:
+    if is_eth_address(addr):
+        return addr
+
+
+# pycoin netcodes of the base58 chains by network, used by the blocks too
+NETCODES: Dict[str, Dict[str, str]] = {
+    'btc': {'mainnet': 'BTC', 'testnet': 'XTN'},
+    'ltc': {'mainnet': 'LTC', 'testnet': 'XTN'},
+}
+
+VALIDATORS: Dict[str, Validator] = {
+    'bch': validate_bch,
+    'eth': validate_eth,
+    'lnd': validate_eth,
+}
+
+
+def netcode_validator(*netcodes: str) -> Validator:
+    """Validator of base58 addresses of any of netcodes"""
+    def validate(addr: str) -> Optional[str]:
+        if address_netcode(addr) in netcodes:
+            return addr
+    return validate
+
+
+@lru_cache(maxsize=None)
+def get_validator(
+    ccy: str, networks: Sequence[str] = ('mainnet',)
+) -> Optional[Validator]:
+    """Validator of ccy addresses on any of networks, None if unknown
+
+    Validators return the address as the block expects it, or None when
+    it is not valid.
+    """
+    ccy = ccy.lower()
+    if ccy in NETCODES:
+        return netcode_validator(*(
+            NETCODES[ccy][network] for network in networks
+        ))
+    return VALIDATORS.get(ccy)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool validating addresses in bulk"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(settings.VALIDATION_WORKERS)
+        )
+    return _executor
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, List, Tuple
+
+from . import settings
+from .blocks.base import BaseBlock
+
+logger = logging.getLogger(__name__)
+
+
+class WalletPool:
+    """Wallets of a block created ahead of time
+
+    Wallets are handed out from the pool and, once fewer than ``low``
+    are left, it is refilled up to ``high`` in the background with
+    :meth:`.BaseBlock.create_pooled_wallets`, ``batch`` wallets at a time.
+    A request finding the pool empty waits for the refill.
+
+    Pooled wallets only live in memory, the ones not handed out are lost
+    with the process, so they hold nothing of value. Wallets needing
+    funds, e.g. LND ones needing ether for gas, are funded with
+    :meth:`.BaseBlock.fund_wallets` as they are handed out, together with
+    the others handed out in the same loop iteration.
+    """
+    def __init__(
+        self, block: BaseBlock,
+        low: int = int(settings.WALLET_POOL_LOW),
+        high: int = int(settings.WALLET_POOL_HIGH),
+        batch: int = int(settings.WALLET_POOL_BATCH),
+    ):
+        assert 0 <= low <= high and high >= 1 and batch > 0, \
+            'bad wallet pool sizes'
+        self.block = block
+        self.low = low
+        self.high = high
+        self.batch = batch
+        self.wallets: Deque[Tuple[str, str]] = deque()
+        self.loop = None
+        self.task = None
+        self.handle = None
+        self.unfunded: List[Tuple[Tuple[str, str], asyncio.Future]] = []
+
+    def __len__(self):
+        return len(self.wallets)
+
+    async def get(self) -> Tuple[str, str]:
+        """A wallet (address, private key) from the pool"""
+        while not self.wallets:
+            self.refill()
+            await self.task
+        wallet = self.wallets.popleft()
+        if len(self.wallets) < self.low:
+            self.refill()
+        await self.fund(wallet)
+        return wallet
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.task = None
+            self.handle = None
+            self.unfunded = []
+        return loop
+
+    def refill(self):
+        """Start refilling the pool unless it is already being refilled"""
+        loop = self.get_loop()
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.fill())
+            self.task.add_done_callback(self._filled)
+
+    async def fill(self):
+        while len(self.wallets) < self.high:
+            n = min(self.batch, self.high - len(self.wallets))
+            self.wallets.extend(await self.block.create_pooled_wallets(n))
+
+    async def fund(self, wallet: Tuple[str, str]):
+        """Fund wallet, returns once the batch it is in was funded"""
+        loop = self.get_loop()
+        future = loop.create_future()
+        self.unfunded.append((wallet, future))
+        if len(self.unfunded) >= self.batch:
+            self.flush()
+        elif self.handle is None:
+            self.handle = loop.call_soon(self.flush)
+        await future
+
+    def flush(self):
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+        unfunded, self.unfunded = self.unfunded, []
+        if unfunded:
+            self.loop.create_task(self.send(unfunded))
+
+    async def send(self, unfunded):
+        try:
+            await self.block.fund_wallets([wallet for wallet, _ in unfunded])
+        except Exception as exc:
+            for _, future in unfunded:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for _, future in unfunded:
+            if not future.done():
+                future.set_result(None)
+
+    def _filled(self, task):
+        if not task.cancelled() and task.exception():
+            logger.error(
+                'could not refill the %s wallet pool: %r',
+                self.block.CCY, task.exception()
+            )
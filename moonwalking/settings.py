@@ -1,5 +1,6 @@
 import os
 import json
+from functools import lru_cache
 
 
 cd = os.path.dirname
@@ -7,26 +8,85 @@ ROOT_DIR = cd(__file__)
 
 LITECOIN_FEE = os.environ.get('LITECOIN_FEE') or '10'  # satoshi / byte
 LITECOIN_URL = os.environ.get('LITECOIN_URL')
+LITECOIN_WALLET_URL = os.environ.get('LITECOIN_WALLET_URL')
 BITCOIN_CASH_FEE = os.environ.get('BITCOIN_CASH_FEE') or '10'  # satoshi / byte
 BITCOIN_CASH_URL = os.environ.get('BITCOIN_CASH_URL')
+BITCOIN_CASH_WALLET_URL = os.environ.get('BITCOIN_CASH_WALLET_URL')
 BITCOIN_URL = os.environ.get('BITCOIN_URL')
+# node of the wallet with the imported addresses, the first url if not set
+BITCOIN_WALLET_URL = os.environ.get('BITCOIN_WALLET_URL')
 BITCOIN_FEE = os.environ.get('BITCOIN_FEE')  # satoshi / byte
 BITCOIN_FEE_URL = os.environ.get('BITCOIN_FEE_URL')
 ETH_FEE = os.environ.get('ETH_FEE')  # gas price in gwei
 ETH_URL = os.environ.get('ETH_URL')
+# chain id of the ethereum testnet, the mainnet one is 1
 ETH_CHAIN_ID = os.environ.get('ETH_CHAIN_ID') or '4'
 
 BUFFER_ETH_PRIV = os.environ.get('BUFFER_ETH_PRIV')
 LND_WALLETS_TOPUP_TRANS_NO = os.environ.get('LND_WALLETS_TOPUP_TRANS_NO', '10')
 LND_CONTRACT_ADDR = os.environ.get('LND_CONTRACT_ADDR')
+ETH_ESTIMATE_GAS = (os.environ.get('ETH_ESTIMATE_GAS') or '1') == '1'
+GAS_ESTIMATE_MARGIN = os.environ.get('GAS_ESTIMATE_MARGIN') or '20'  # %
+CONTRACT_CACHE_SIZE = os.environ.get('CONTRACT_CACHE_SIZE') or '100000'
+# Multicall contract aggregating eth_calls, calls are batched without it
+MULTICALL_ADDR = os.environ.get('MULTICALL_ADDR')
+MULTICALL_SIZE = os.environ.get('MULTICALL_SIZE') or '500'
+# Disperse contract paying many LND recipients in one transaction
+DISPERSE_CONTRACT_ADDR = os.environ.get('DISPERSE_CONTRACT_ADDR')
+DISPERSE_MAX_GAS = os.environ.get('DISPERSE_MAX_GAS') or '3000000'
 USE_TESTNET = (os.environ.get('USE_TESTNET') or '1') == "1"
 FEE_CACHE_TIME = (os.environ.get('FEE_CACHE_TIME') or '10')
+UTXO_CACHE = (os.environ.get('UTXO_CACHE') or '0') == '1'
+NONCE_MANAGER = (os.environ.get('NONCE_MANAGER') or '0') == '1'
+COIN_SELECTION = os.environ.get('COIN_SELECTION') or 'bnb'
+# fee sources by priority: static, node, api and, for ETH only, history.
+# static is the *_FEE setting of the block and is only there when set, so
+# by default a configured fee is used as is, as it always was
+FEE_SOURCES = tuple(
+    (os.environ.get('FEE_SOURCES') or 'static,node,api').split(',')
+)
+FEE_CACHE_MAX_AGE = (os.environ.get('FEE_CACHE_MAX_AGE') or '60')
+FEE_STALE_WHILE_REVALIDATE = (
+    os.environ.get('FEE_STALE_WHILE_REVALIDATE') or '0'
+) == '1'
+# currencies whose wallets are created ahead of time, e.g. 'btc,lnd'
+WALLET_POOL = tuple(
+    ccy for ccy in (os.environ.get('WALLET_POOL') or '').split(',') if ccy
+)
+WALLET_POOL_LOW = os.environ.get('WALLET_POOL_LOW') or '10'
+WALLET_POOL_HIGH = os.environ.get('WALLET_POOL_HIGH') or '50'
+WALLET_POOL_BATCH = os.environ.get('WALLET_POOL_BATCH') or '20'
+# addresses of new bitcoin-family wallets imported together
+IMPORT_WINDOW = os.environ.get('IMPORT_WINDOW') or '0'  # ms
+IMPORT_BATCH_SIZE = os.environ.get('IMPORT_BATCH_SIZE') or '1000'
+ADDRESS_CACHE_SIZE = os.environ.get('ADDRESS_CACHE_SIZE') or '100000'
+VALIDATION_WORKERS = os.environ.get('VALIDATION_WORKERS') or '4'
+VALIDATION_CHUNK_SIZE = os.environ.get('VALIDATION_CHUNK_SIZE') or '1000'
+HTTP_POOL_SIZE = os.environ.get('HTTP_POOL_SIZE') or '100'
+# balancing of the calls between the nodes of a block with several URLs,
+# least_outstanding or latency
+NODE_BALANCING = os.environ.get('NODE_BALANCING') or 'least_outstanding'
+NODE_PROBE_INTERVAL = os.environ.get('NODE_PROBE_INTERVAL') or '30'  # s
+NODE_MAX_LAG = os.environ.get('NODE_MAX_LAG') or '3'  # blocks
+HTTP_KEEPALIVE_TIMEOUT = os.environ.get('HTTP_KEEPALIVE_TIMEOUT') or '30'
+RPC_BATCH_SIZE = os.environ.get('RPC_BATCH_SIZE') or '500'
+RPC_COALESCE_WINDOW = os.environ.get('RPC_COALESCE_WINDOW') or '0'  # ms
+RPC_COALESCE_SIZE = os.environ.get('RPC_COALESCE_SIZE') or '100'
+RPC_CONCURRENCY = os.environ.get('RPC_CONCURRENCY') or '8'
+SIGN_SHARD_SIZE = os.environ.get('SIGN_SHARD_SIZE') or '50'  # inputs
+BROADCAST_RETRIES = os.environ.get('BROADCAST_RETRIES') or '3'
+BROADCAST_BACKOFF = os.environ.get('BROADCAST_BACKOFF') or '200'  # ms
+BROADCAST_MAX_BACKOFF = os.environ.get('BROADCAST_MAX_BACKOFF') or '5000'  # ms
 
 
 COMPILED_CONTRACT_JSON = os.path.join(ROOT_DIR, 'LendingBlockToken.json')
 
-with open(COMPILED_CONTRACT_JSON) as fp:
-    LND_CONTRACT = json.load(fp)
+
+@lru_cache(maxsize=None)
+def lnd_contract() -> dict:
+    """Compiled LND token contract, loaded on first use"""
+    with open(COMPILED_CONTRACT_JSON) as fp:
+        return json.load(fp)
 
 
 assert BITCOIN_FEE is None or BITCOIN_FEE.isdigit(), \
@@ -36,3 +96,38 @@ assert ETH_FEE is None or ETH_FEE.isdigit(), \
 assert BITCOIN_CASH_FEE.isdigit(), 'BITCOIN_CASH_FEE must be an integer'
 assert LITECOIN_FEE.isdigit(), 'LITECOIN_FEE must be an integer'
 assert FEE_CACHE_TIME.isdigit(), 'FEE_CACHE_TIME must be an integer'
+assert FEE_CACHE_MAX_AGE.isdigit(), 'FEE_CACHE_MAX_AGE must be an integer'
+assert WALLET_POOL_LOW.isdigit(), 'WALLET_POOL_LOW must be an integer'
+assert WALLET_POOL_HIGH.isdigit(), 'WALLET_POOL_HIGH must be an integer'
+assert WALLET_POOL_BATCH.isdigit(), 'WALLET_POOL_BATCH must be an integer'
+assert IMPORT_WINDOW.isdigit(), 'IMPORT_WINDOW must be an integer'
+assert IMPORT_BATCH_SIZE.isdigit(), 'IMPORT_BATCH_SIZE must be an integer'
+assert ADDRESS_CACHE_SIZE.isdigit(), 'ADDRESS_CACHE_SIZE must be an integer'
+assert VALIDATION_WORKERS.isdigit(), 'VALIDATION_WORKERS must be an integer'
+assert VALIDATION_CHUNK_SIZE.isdigit(), \
+    'VALIDATION_CHUNK_SIZE must be an integer'
+assert NODE_BALANCING in ('least_outstanding', 'latency'), \
+    'NODE_BALANCING must be least_outstanding or latency'
+assert NODE_PROBE_INTERVAL.isdigit(), \
+    'NODE_PROBE_INTERVAL must be an integer'
+assert NODE_MAX_LAG.isdigit(), 'NODE_MAX_LAG must be an integer'
+assert HTTP_POOL_SIZE.isdigit(), 'HTTP_POOL_SIZE must be an integer'
+assert HTTP_KEEPALIVE_TIMEOUT.isdigit(), \
+    'HTTP_KEEPALIVE_TIMEOUT must be an integer'
+assert RPC_BATCH_SIZE.isdigit(), 'RPC_BATCH_SIZE must be an integer'
+assert RPC_COALESCE_WINDOW.isdigit(), \
+    'RPC_COALESCE_WINDOW must be an integer'
+assert RPC_COALESCE_SIZE.isdigit(), 'RPC_COALESCE_SIZE must be an integer'
+assert GAS_ESTIMATE_MARGIN.isdigit(), \
+    'GAS_ESTIMATE_MARGIN must be an integer'
+assert CONTRACT_CACHE_SIZE.isdigit(), \
+    'CONTRACT_CACHE_SIZE must be an integer'
+assert ETH_CHAIN_ID.isdigit(), 'ETH_CHAIN_ID must be an integer'
+assert MULTICALL_SIZE.isdigit(), 'MULTICALL_SIZE must be an integer'
+assert DISPERSE_MAX_GAS.isdigit(), 'DISPERSE_MAX_GAS must be an integer'
+assert RPC_CONCURRENCY.isdigit(), 'RPC_CONCURRENCY must be an integer'
+assert SIGN_SHARD_SIZE.isdigit(), 'SIGN_SHARD_SIZE must be an integer'
+assert BROADCAST_RETRIES.isdigit(), 'BROADCAST_RETRIES must be an integer'
+assert BROADCAST_BACKOFF.isdigit(), 'BROADCAST_BACKOFF must be an integer'
+assert BROADCAST_MAX_BACKOFF.isdigit(), \
+    'BROADCAST_MAX_BACKOFF must be an integer'
@@ -39,7 +39,7 @@ async def create_lnd_contract():
         'from': ETH_MAIN_ADDR,
         'gas': 4000000,
         'gasPrice': 100,
-        'data': settings.LND_CONTRACT['bytecode'],
+        'data': settings.lnd_contract()['bytecode'],
     })
     receipt = await eth.post(
         'eth_getTransactionReceipt',
@@ -1,5 +1,6 @@
 import random
 import string
+from collections import OrderedDict
 
 
 def rand_str(n=10):
@@ -9,5 +10,43 @@ def rand_str(n=10):
     ))
 
 
+def chunks(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+class LRUCache:
+    """Mapping keeping the maxsize most recently used items"""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __getitem__(self, key):
+        value = self.data[key]
+        self.data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def clear(self):
+        self.data.clear()
+
+
 class GeneralError(Exception):
     """raised when something is wrong and we cannot handle it properly"""
@@ -1,4 +1,10 @@
-from .main import BLOCKS
+from typing import Dict
+
+from . import settings
+from .blocks.registry import BLOCKS
+from .pool import WalletPool
+
+POOLS: Dict[str, WalletPool] = {}
 
 
 def block(currency):
@@ -12,9 +18,30 @@ def validate_addr(currency, addr):
     return block(currency).validate_addr(addr)
 
 
+async def validate_addrs(currency, addrs):
+    """Result of validate_addr for each address"""
+    return await block(currency).validate_addrs(addrs)
+
+
 def create_addr(currency):
     return block(currency).create_addr()
 
 
+def wallet_pool(currency) -> WalletPool:
+    if currency not in POOLS:
+        POOLS[currency] = WalletPool(block(currency))
+    return POOLS[currency]
+
+
 async def create_wallet(currency):
+    if currency in settings.WALLET_POOL:
+        return await wallet_pool(currency).get()
     return await block(currency).create_wallet()
+
+
+async def create_wallets(currency, n):
+    return await block(currency).create_wallets(n)
+
+
+async def get_balances(currency, addrs):
+    return await block(currency).get_balances(addrs)
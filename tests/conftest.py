@@ -29,6 +29,14 @@ async def calc_fee_mock(self, tx):
     return 500
 
 
+async def get_fee_rate_mock(self):
+    return 1
+
+
+async def calc_bch_fee_mock(self, n_in, n_out):
+    return 500
+
+
 async def get_gas_price_mock(self):
     return to_wei(10, 'gwei')
 
@@ -43,9 +51,13 @@ async def fee_mocker(mocker):
         'moonwalking.main.Litecoin.calc_fee',
         calc_fee_mock
     )
+    mocker.patch(
+        'moonwalking.blocks.bitcoin_generic.BitcoinGeneric.get_fee_rate',
+        get_fee_rate_mock
+    )
     mocker.patch(
         'moonwalking.main.BitcoinCash.calc_fee',
-        lambda x, y, z: 500
+        calc_bch_fee_mock
     )
     mocker.patch(
         'moonwalking.blocks.eth_generic.EthereumGeneric.get_gas_price',
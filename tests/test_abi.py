@@ -0,0 +1,39 @@
+from eth_abi.abi import encode_abi
+
+from moonwalking import settings
+from moonwalking.blocks.abi import ContractABI
+
+ADDR = '0x5ce9454909639D2D17A3F753ce7d93fa0b9aB12E'
+
+
+def test_selectors():
+    abi = ContractABI.from_file(settings.COMPILED_CONTRACT_JSON)
+    assert abi['transfer'].selector == '0xa9059cbb'
+    assert abi['balanceOf'].signature == 'balanceOf(address)'
+    assert abi.selectors['0x70a08231'] is abi['balanceOf']
+    assert 'Transfer' not in abi
+
+
+def test_encode_static():
+    abi = ContractABI(settings.lnd_contract()['abi'])
+    data = abi.encode('transfer', ADDR, 10 ** 18)
+    assert data == '0xa9059cbb' + encode_abi(
+        ['address', 'uint256'], [ADDR, 10 ** 18]
+    ).hex()
+
+
+def test_encode_decode_tuples():
+    abi = ContractABI([{
+        'name': 'aggregate',
+        'inputs': [{
+            'type': 'tuple[]',
+            'components': [{'type': 'address'}, {'type': 'bytes'}],
+        }],
+        'outputs': [{'type': 'uint256'}, {'type': 'bytes[]'}],
+    }])
+    function = abi['aggregate((address,bytes)[])']
+    assert function.encoders is None
+    data = function.encode([(ADDR, b'\x01')])
+    assert data.startswith(function.selector)
+    result = encode_abi(['uint256', 'bytes[]'], [7, [b'\x02']])
+    assert function.decode(result) == (7, (b'\x02',))
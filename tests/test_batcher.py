@@ -0,0 +1,56 @@
+import asyncio
+
+from moonwalking.main import Ethereum
+
+
+async def test_coalesce_calls(mocker):
+    eth = Ethereum()
+    eth.COALESCE_WINDOW = 2
+    batches = []
+
+    async def post_json(data):
+        batches.append(data)
+        return [
+            {'id': call['id'], 'result': call['method']} for call in data
+        ]
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    results = await asyncio.gather(
+        eth.post('eth_gasPrice'),
+        eth.post('eth_gasPrice'),
+        eth.post('eth_blockNumber'),
+        eth.post('eth_sendRawTransaction', '0x00'),
+        eth.post('eth_sendRawTransaction', '0x00'),
+    )
+    assert results == [
+        'eth_gasPrice',
+        'eth_gasPrice',
+        'eth_blockNumber',
+        'eth_sendRawTransaction',
+        'eth_sendRawTransaction',
+    ]
+    assert len(batches) == 1
+    assert [call['method'] for call in batches[0]] == [
+        'eth_gasPrice',
+        'eth_blockNumber',
+        'eth_sendRawTransaction',
+        'eth_sendRawTransaction',
+    ]
+
+
+async def test_coalesce_max_size(mocker):
+    eth = Ethereum()
+    eth.COALESCE_WINDOW = 1000
+    eth.COALESCE_SIZE = 2
+    batches = []
+
+    async def post_json(data):
+        batches.append(data)
+        return [{'id': call['id'], 'result': '0x1'} for call in data]
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    await asyncio.gather(
+        eth.post('eth_getBalance', '0x1', 'latest'),
+        eth.post('eth_getBalance', '0x2', 'latest'),
+    )
+    assert len(batches) == 1
@@ -1,10 +1,14 @@
+import asyncio
 from decimal import Decimal as D
 
 import pytest
 from bitcoin.core import COIN
+from pycoin.tx.Tx import Tx
+from pycoin.tx.TxOut import TxOut
+from pycoin.ui import standard_tx_out_script
 
 from moonwalking.main import Bitcoin
-from moonwalking.blocks.exc import NotEnoughAmountError
+from moonwalking.blocks.exc import AddressImportError, NotEnoughAmountError
 from moonwalking.wallets import create_addr
 
 
@@ -95,3 +99,150 @@ async def test_insufficient_amount_to_cover_fee(fee_mocker):
     with pytest.raises(NotEnoughAmountError):
         await bitcoin.send_money(priv1, [(addr2, D(10000) / COIN)],
                                  split_fee=False)
+
+
+async def test_get_balances_groups_by_address(mocker):
+    bitcoin = Bitcoin()
+    bitcoin.LISTUNSPENT_SIZE = 2
+    addrs = ['addr1', 'addr2', 'addr3']
+
+    async def post_json(data):
+        assert [call['params'][2] for call in data] == [
+            ['addr1', 'addr2'], ['addr3']
+        ]
+        return [
+            {'id': 0, 'result': [
+                {'address': 'addr1', 'amount': 0.0001},
+                {'address': 'addr2', 'amount': 0.00025},
+                {'address': 'addr1', 'amount': 0.0002},
+            ]},
+            {'id': 1, 'result': []},
+        ]
+
+    mocker.patch.object(bitcoin, 'post_json', post_json)
+    assert await bitcoin.get_balances(addrs) == {
+        'addr1': D(30000) / COIN,
+        'addr2': D(25000) / COIN,
+        'addr3': D(0),
+    }
+
+
+async def test_utxo_cache(mocker):
+    mocker.patch('moonwalking.settings.UTXO_CACHE', True)
+    bitcoin = Bitcoin()
+    addr = 'mtXWDB6k5yC5v7TcwKZHB89SUp85yCKshy'
+    script = '76a9148eb446f809f526fb37059a32cf8255c4cb43d2da88ac'
+    txid1 = '11' * 32
+    txid2 = '22' * 32
+    node = {'height': 100, 'listunspent': 0}
+
+    async def post_json(data):
+        calls = data if isinstance(data, list) else [data]
+        results = []
+        for call in calls:
+            method = call['method']
+            if method == 'getblockcount':
+                result = node['height']
+            elif method == 'getbestblockhash':
+                result = 'block100'
+            elif method == 'listunspent':
+                node['listunspent'] += 1
+                result = [{
+                    'txid': txid1, 'vout': 0, 'address': addr,
+                    'amount': 0.0002, 'confirmations': 1,
+                    'scriptPubKey': script,
+                }]
+            elif method == 'listsinceblock':
+                assert call['params'][0] == 'block100'
+                result = {'lastblock': 'block101', 'transactions': [{
+                    'txid': txid2, 'vout': 1, 'address': addr,
+                    'category': 'receive', 'amount': 0.0001,
+                    'confirmations': 1,
+                }]}
+            results.append({'id': call['id'], 'result': result})
+        return results if isinstance(data, list) else results[0]
+
+    mocker.patch.object(bitcoin, 'post_json', post_json)
+    assert await bitcoin.get_balance(addr) == D(20000) / COIN
+    assert await bitcoin.get_balance(addr) == D(20000) / COIN
+    node['height'] = 101
+    assert await bitcoin.get_balance(addr) == D(30000) / COIN
+    assert await bitcoin.get_balances([addr]) == {addr: D(30000) / COIN}
+    assert node['listunspent'] == 1
+
+    spendables = await bitcoin.get_spendable_list_for_addr(addr)
+    assert len(spendables) == 2
+    tx = Tx(
+        version=1,
+        txs_in=[spendables[0].tx_in()],
+        txs_out=[TxOut(15000, standard_tx_out_script(addr))],
+    )
+    bitcoin.utxo_cache.apply_tx(tx)
+    assert await bitcoin.get_balance(addr) == D(25000) / COIN
+
+
+async def test_import_addresses_in_batches(mocker):
+    bitcoin = Bitcoin()
+    bitcoin.IMPORT_WINDOW = 5
+    imports = []
+
+    async def post_json(data):
+        imports.append([
+            request['scriptPubKey']['address']
+            for call in data for request in call['params'][0]
+        ])
+        assert all(call['params'][1] == {'rescan': False} for call in data)
+        return [
+            {'id': call['id'], 'result': [
+                {'success': True} for _ in call['params'][0]
+            ]}
+            for call in data
+        ]
+
+    mocker.patch.object(bitcoin, 'post_json', post_json)
+    wallets = await asyncio.gather(*(
+        bitcoin.create_wallet() for _ in range(3)
+    ))
+    assert imports == [[addr for addr, _ in wallets]]
+
+
+async def test_import_addresses_errors(mocker):
+    bitcoin = Bitcoin()
+    bitcoin.IMPORT_BATCH_SIZE = 1
+
+    async def post_json(data):
+        return [
+            {'id': 0, 'result': [{'success': True}]},
+            {'id': 1, 'result': [
+                {'success': False, 'error': {'message': 'Invalid address'}}
+            ]},
+        ]
+
+    mocker.patch.object(bitcoin, 'post_json', post_json)
+    with pytest.raises(AddressImportError) as exc_info:
+        await bitcoin.import_addresses(['addr1', 'addr2'])
+    assert exc_info.value.data == {'addr2': {'message': 'Invalid address'}}
+
+
+async def test_import_addresses_partial_errors(mocker):
+    bitcoin = Bitcoin()
+    bitcoin.IMPORT_WINDOW = 5
+    addrs = [bitcoin.create_addr()[0] for _ in range(3)]
+
+    async def post_json(data):
+        return [
+            {'id': call['id'], 'result': [
+                {'success': request['scriptPubKey']['address'] != addrs[1],
+                 'error': {'message': 'Invalid address'}}
+                for request in call['params'][0]
+            ]}
+            for call in data
+        ]
+
+    mocker.patch.object(bitcoin, 'post_json', post_json)
+    results = await asyncio.gather(*(
+        bitcoin.importer.add(addr) for addr in addrs
+    ), return_exceptions=True)
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], AddressImportError)
+    assert results[1].data == {addrs[1]: {'message': 'Invalid address'}}
@@ -24,9 +24,8 @@ async def test_bitcoin_create_wallet():
     assert pycoin.key.Key.from_text(priv2).address() == addr2
 
 
-async def test_bitcoin_validate_addr(mocker):
-    bitcoin = Bitcoin()
-    mocker.patch('moonwalking.settings.USE_TESTNET', None)
+async def test_bitcoin_validate_addr():
+    bitcoin = Bitcoin(network='mainnet')
 
     # testnet address
     assert bitcoin.validate_addr('mn8eCaT46d8mEn62ussMtE467J4mSgu5zA') is None
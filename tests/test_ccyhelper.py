@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 from moonwalking.blocks.ccyhelper import CcyHelper
 
 
@@ -32,3 +35,15 @@ def test_ccyhelper():
 
     ccyhelper = CcyHelper('fake_currency')
     assert not ccyhelper.validate_addr('1F1tAaz5x1HUXrCNLbtMDqcw6o5GNn4xqX')
+
+
+def test_ccyhelper_imports():
+    code = (
+        'import sys\n'
+        'from moonwalking.blocks.ccyhelper import CcyHelper\n'
+        "assert CcyHelper('bch').validate_addr("
+        "'mhstAGNEZYNxwpwgAqwX31sK2TK7SntHCK')\n"
+        "heavy = {'aiohttp', 'bitcash', 'pywallet', 'eth_account'}\n"
+        'assert not heavy & set(sys.modules), heavy & set(sys.modules)\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from moonwalking.blocks.coinselect import (
+    branch_and_bound, knapsack, largest_first, select_coins
+)
+from moonwalking.blocks.exc import NotEnoughAmountError
+
+
+def test_branch_and_bound_exact():
+    values = [1000, 2000, 3000, 4000, 8000]
+    selected = branch_and_bound(values, 7000, 0)
+    assert sum(values[i] for i in selected) == 7000
+    assert branch_and_bound(values, 7500, 0) is None
+    assert branch_and_bound(values, 7500, 600) is not None
+    assert branch_and_bound(values, 20000, 0) is None
+
+
+def test_knapsack():
+    rng = random.Random(1)
+    values = [500, 1000, 2000, 50000]
+    assert knapsack(values, 1000, rng) == [1]
+    assert sorted(knapsack(values, 2500, rng)) == [0, 2]
+    assert knapsack(values, 10000, rng) == [3]
+    assert knapsack([100, 200], 1000, rng) is None
+
+
+def test_largest_first():
+    values = [500, 1000, 2000, 50000]
+    assert largest_first(values, 1500) == [3]
+    assert largest_first(values, 51000) == [3, 2]
+    assert largest_first(values, 60000) is None
+
+
+def test_select_coins_changeless():
+    coins = [10000, 20000, 40000, 5000]
+    selection = select_coins(coins, 24500, fee_rate=1)
+    assert sorted(selection.inputs) == [5000, 20000]
+    assert selection.fee == 10 + 34 + 2 * 148
+    assert selection.change == 0
+    assert selection.waste == 25000 - 24500 - selection.fee
+
+    selection = select_coins(coins, 24000, fee_rate=0)
+    assert selection.change == selection.value - 24000
+
+
+def test_select_coins_dust_change():
+    selection = select_coins([100000, 5000, 3000], 7990, fee_rate=0)
+    assert selection.value == 8000
+    assert selection.change == 0
+    assert selection.waste == 10
+
+    selection = select_coins([100000, 5000, 3000], 7990, fee_rate=1)
+    assert selection.inputs == [100000]
+    assert selection.change > 546
+
+
+def test_select_coins_subtract_fee():
+    coins = [10000, 20000, 40000, 5000]
+    selection = select_coins(coins, 25000, fee_rate=1, subtract_fee=True)
+    assert selection.value == 25000
+    assert selection.change == 0
+    assert selection.fee == 10 + 34 + 2 * 148
+
+    selection = select_coins(coins, 24000, fee_rate=1, subtract_fee=True)
+    assert selection.change == selection.value - 24000
+    assert selection.fee == 10 + 2 * 34 + 148 * len(selection.inputs)
+
+
+def test_select_coins_with_fee():
+    coins = [10000, 20000, 40000, 5000]
+    selection = select_coins(coins, 30000, fee_rate=10, n_outputs=2)
+    assert selection.value >= 30000 + selection.fee + selection.change
+    assert selection.fee >= 10 * (10 + 2 * 34 + 148 * len(selection.inputs))
+
+    selection = select_coins(coins, 1000, fee_rate=1, strategy='all')
+    assert len(selection.inputs) == 4
+
+    with pytest.raises(NotEnoughAmountError):
+        select_coins(coins, 75000, fee_rate=10)
+
+    with pytest.raises(ValueError):
+        select_coins(coins, 1000, strategy='random')
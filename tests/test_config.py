@@ -0,0 +1,62 @@
+from bitcash import PrivateKey, PrivateKeyTestnet
+
+from moonwalking.blocks.fee import FeeStation
+from moonwalking.blocks.registry import BLOCKS
+from moonwalking.main import Bitcoin, BitcoinCash, Ethereum
+
+TESTNET_ADDR = 'mtXWDB6k5yC5v7TcwKZHB89SUp85yCKshy'
+MAINNET_ADDR = '1F1tAaz5x1HUXrCNLbtMDqcw6o5GNn4xqX'
+
+
+def test_networks():
+    testnet = Bitcoin(network='testnet', urls=('http://testnet:18332',))
+    mainnet = BLOCKS.create(
+        'btc', testnet.config._replace(network='mainnet'),
+        urls=('http://mainnet:8332',),
+    )
+    assert isinstance(mainnet, Bitcoin)
+    assert (testnet.URL, testnet.NETCODE) == ('http://testnet:18332', 'XTN')
+    assert (mainnet.URL, mainnet.NETCODE) == ('http://mainnet:8332', 'BTC')
+    assert testnet.NET_WALLET == 'btctest'
+    assert mainnet.NET_WALLET == 'btc'
+    assert testnet.validate_addr(TESTNET_ADDR) == TESTNET_ADDR
+    assert mainnet.validate_addr(TESTNET_ADDR) is None
+    assert mainnet.validate_addr(MAINNET_ADDR) == MAINNET_ADDR
+    assert testnet.fee_station.key != mainnet.fee_station.key
+    assert mainnet.create_addr()[0][0] in '13'
+
+
+def test_key_class():
+    assert BitcoinCash(network='mainnet').KEY_CLASS is PrivateKey
+    assert BitcoinCash(network='testnet').KEY_CLASS is PrivateKeyTestnet
+
+
+async def test_chain_id(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, clear=True)
+    eth = Ethereum(chain_id=3, fee='8', fee_sources=('static',))
+    addr, priv = eth.create_addr()
+    tx = await eth.get_transaction_dict(
+        priv, addr, 1, 0, '', False, gas=21000
+    )
+    assert tx['chainId'] == 3
+    assert tx['gasPrice'] == 8 * 10 ** 9
+
+
+async def test_fee_per_instance(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, clear=True)
+    low = Bitcoin(fee='5', fee_sources=('static',))
+    high = Bitcoin(fee='50', fee_sources=('static',))
+    assert await low.fee_station.get_fee() == 5
+    assert await high.fee_station.get_fee() == 50
+    assert await Bitcoin(fee='5', fee_sources=('static',)).get_fee_rate() == 5
+
+
+def test_chain_id_by_network():
+    assert Ethereum(network='mainnet').CHAIN_ID == 1
+    assert Ethereum(network='testnet').CHAIN_ID == Ethereum.CHAIN_IDS[
+        'testnet'
+    ]
+    assert Ethereum(network='mainnet', chain_id=3).CHAIN_ID == 3
+    testnet = Ethereum(network='testnet')
+    mainnet = BLOCKS.create('eth', testnet.config._replace(network='mainnet'))
+    assert mainnet.CHAIN_ID == 1
@@ -1,10 +1,16 @@
+import asyncio
 from decimal import Decimal as D
 import pytest
 
 from eth_utils import from_wei, to_checksum_address
 
 from moonwalking import wallets
-from moonwalking.blocks.exc import NotEnoughAmountError
+from moonwalking.blocks.exc import (
+    BroadcastError, EthereumError, NotEnoughAmountError,
+    ReplacementTransactionError
+)
+from moonwalking.blocks.broadcast import Broadcaster
+from moonwalking.blocks.eth_generic import CONTRACTS, get_account
 from moonwalking.main import Ethereum
 from moonwalking.testing import ETH_MAIN_ADDR, send_eth
 
@@ -116,3 +122,178 @@ async def test_send_money_contract(fee_mocker):
     assert await eth.send_money(priv1, [(addr2, D('0.5'))])
     fee = D(50000) * D(from_wei(10, 'gwei'))
     assert await eth.get_balance(addr2) == D('0.5') - fee
+
+
+async def test_post_batch_errors(mocker):
+    eth = Ethereum()
+
+    async def post_json(data):
+        return [
+            {'id': 1, 'error': {
+                'message': 'replacement transaction underpriced'
+            }},
+            {'id': 0, 'result': '0x1'},
+            {'id': 2, 'error': {'message': 'nonce too low'}},
+        ]
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    results = await eth.post_batch([
+        ('eth_blockNumber',),
+        ('eth_sendRawTransaction', '0x00'),
+        ('eth_sendRawTransaction', '0x01'),
+    ], return_exceptions=True)
+    assert results[0] == '0x1'
+    assert isinstance(results[1], ReplacementTransactionError)
+    assert isinstance(results[2], EthereumError)
+
+    with pytest.raises(ReplacementTransactionError):
+        await eth.post_batch([
+            ('eth_blockNumber',),
+            ('eth_sendRawTransaction', '0x00'),
+        ])
+
+
+async def test_build_tx_batches_code_checks(mocker):
+    CONTRACTS.clear()
+    eth = Ethereum()
+    eth.BATCH_SIZE = 2
+    addr, priv = eth.create_addr()
+    contract = to_checksum_address('0x' + '22' * 20)
+    batches = []
+    results = {
+        'eth_getBalance': hex(10 ** 20),
+        'eth_getTransactionCount': '0x5',
+    }
+
+    def respond(call):
+        return {
+            'id': call['id'],
+            'result': results.get(
+                call['method'],
+                '0x6060' if call['params'][0] == contract else '0x',
+            ),
+        }
+
+    async def post_json(data):
+        if isinstance(data, dict):
+            return respond(data)
+        batches.append(data)
+        return [respond(call) for call in data]
+
+    async def get_gas_price():
+        return 10
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    mocker.patch.object(eth, 'get_gas_price', get_gas_price)
+    tx = await eth.build_tx(
+        priv,
+        [(addr, D(1)), (contract, D(1)), (addr, D(2)), (ETH_MAIN_ADDR, D(1))],
+    )
+    assert [tx_dict['nonce'] for tx_dict in tx] == [5, 6, 7, 8]
+    assert [tx_dict['gas'] for tx_dict in tx] == [
+        eth.MIN_GAS, eth.CONTRACT_GAS, eth.MIN_GAS, eth.MIN_GAS
+    ]
+    codes = [
+        call['params'][0]
+        for batch in batches for call in batch
+        if call['method'] == 'eth_getCode'
+    ]
+    assert codes == [addr, contract, ETH_MAIN_ADDR]
+
+    # contract checks are cached
+    batches.clear()
+    tx = await eth.build_tx(priv, [(contract, D(1)), (ETH_MAIN_ADDR, D(1))])
+    assert [tx_dict['gas'] for tx_dict in tx] == [
+        eth.CONTRACT_GAS, eth.MIN_GAS
+    ]
+    assert not batches
+
+
+async def test_broadcast_statuses(mocker):
+    eth = Ethereum()
+    sent = []
+
+    async def post_json(data):
+        if isinstance(data, dict):
+            sent.append(data['params'][0])
+            return {'id': data['id'], 'result': '0xb2'}
+        return [
+            {'id': 0, 'result': '0xa0'},
+            {'id': 1, 'error': {
+                'message': 'replacement transaction underpriced'
+            }},
+            {'id': 2, 'error': {'message': 'nonce too low'}},
+            {'id': 3, 'error': {'message': 'already known'}},
+        ]
+
+    async def reprice(index):
+        assert index == 1
+        return '0xbb'
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    with pytest.raises(BroadcastError) as exc_info:
+        await eth.broadcast_tx(['0xaa', '0xab', '0xac', '0xad'], reprice)
+    assert isinstance(exc_info.value, EthereumError)
+    statuses = exc_info.value.data
+    assert [status.ok for status in statuses] == [True, True, False, True]
+    assert statuses[1].tx == '0xbb'
+    assert statuses[1].tx_id == '0xb2'
+    assert statuses[1].attempts == 2
+    assert isinstance(statuses[2].error, EthereumError)
+    assert statuses[3].tx_id.startswith('0x')
+    assert sent == ['0xbb']
+
+
+async def test_broadcast_timeout_keeps_nonce(mocker):
+    eth = Ethereum(urls=('http://nonce-node',))
+    eth.NONCE_MANAGER = True
+    mocker.patch.object(Broadcaster, 'get_delay', lambda self, attempts: 0)
+    addr, priv = eth.create_addr()
+
+    async def post_json(data):
+        if isinstance(data, list):
+            return [await post_json(call) for call in data]
+        if data['method'] == 'eth_getTransactionCount':
+            return {'id': data['id'], 'result': '0x5'}
+        raise asyncio.TimeoutError
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    tx = [{
+        'from': addr, 'to': ETH_MAIN_ADDR, 'value': 1, 'gas': 21000,
+        'gasPrice': 10, 'nonce': nonce, 'data': '', 'chainId': 1,
+    } for nonce in await eth.get_nonces(addr, 1)]
+    assert tx[0]['nonce'] == 5
+    with pytest.raises(BroadcastError):
+        await eth.send_tx_dicts(get_account(priv), tx)
+    # the node may have taken it, the nonce is not reused
+    assert await eth.get_nonces(addr, 1) == [6]
+    await eth.close()
+
+
+async def test_reprice_tx_dict(mocker):
+    eth = Ethereum()
+
+    async def get_gas_price():
+        return 10
+
+    mocker.patch.object(eth, 'get_gas_price', get_gas_price)
+    tx_dict = {'gas': 21000, 'gasPrice': 80, 'value': 10 ** 9, 'data': ''}
+    repriced = await eth.reprice_tx_dict(tx_dict)
+    assert repriced['gasPrice'] == 90
+    assert repriced['value'] == 10 ** 9 - 21000 * 10
+
+
+async def test_estimate_gas(mocker):
+    eth = Ethereum()
+
+    async def post_json(data):
+        return [
+            {'id': 0, 'result': hex(30000)},
+            {'id': 1, 'error': {'message': 'execution reverted'}},
+        ]
+
+    mocker.patch.object(eth, 'post_json', post_json)
+    assert await eth.estimate_gas_many(ETH_MAIN_ADDR, [
+        (ETH_MAIN_ADDR, D(0), '0x01'),
+        (ETH_MAIN_ADDR, D(0), '0x02'),
+    ]) == [36000, eth.MAX_GAS]
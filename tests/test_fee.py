@@ -0,0 +1,72 @@
+import asyncio
+
+from moonwalking.blocks.fee import FeeSource, FeeStation, StaticFee
+from moonwalking.main import Bitcoin, Litecoin
+
+
+class CountingFee(FeeSource):
+
+    def __init__(self, fee):
+        self.fee = fee
+        self.calls = 0
+
+    async def get_fee(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.fee
+
+
+class BrokenFee(FeeSource):
+
+    async def get_fee(self):
+        raise ValueError('broken')
+
+
+async def test_single_flight(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, clear=True)
+    source = CountingFee(10)
+    fees = await asyncio.gather(*(
+        FeeStation('eth', [source]).get_fee() for _ in range(10)
+    ))
+    assert fees == [10] * 10
+    assert source.calls == 1
+    assert await FeeStation('eth', [source]).get_fee() == 10
+    assert source.calls == 1
+
+
+async def test_stale_while_revalidate(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, {'eth': (5, -3600)})
+    mocker.patch('moonwalking.settings.FEE_STALE_WHILE_REVALIDATE', True)
+    mocker.patch('moonwalking.settings.FEE_CACHE_MAX_AGE', '1000000000')
+    source = CountingFee(10)
+    assert await FeeStation('eth', [source]).get_fee() == 5
+    await asyncio.sleep(0.02)
+    assert source.calls == 1
+    assert await FeeStation('eth', [source]).get_fee() == 10
+
+
+async def test_fallback_chain(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, clear=True)
+    station = FeeStation('btc', [BrokenFee(), StaticFee(7)])
+    assert await station.get_fee() == 7
+
+
+async def test_node_smart_fee(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, clear=True)
+    bitcoin = Bitcoin()
+
+    async def post_json(data):
+        assert data['method'] == 'estimatesmartfee'
+        return {'result': {'feerate': 0.00012345, 'blocks': 2}}
+
+    mocker.patch.object(bitcoin, 'post_json', post_json)
+    assert await bitcoin.get_fee_rate() == 13
+
+
+async def test_configured_fee_first(mocker):
+    mocker.patch.dict(FeeStation.FEE_CACHES, clear=True)
+    bitcoin = Bitcoin(fee='7')
+    post_json = mocker.patch.object(bitcoin, 'post_json')
+    assert await bitcoin.get_fee_rate() == 7
+    assert not post_json.called
+    assert Litecoin().fee_station.sources[0].fee == 10
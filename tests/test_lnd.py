@@ -1,7 +1,14 @@
+import asyncio
 from decimal import Decimal as D
 
+import pytest
+
+from eth_abi.abi import decode_abi, encode_abi
 from eth_account import Account
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
 
+from moonwalking.blocks.eth_generic import DISPERSE_ABI, MULTICALL_ABI
 from moonwalking.main import Lendingblock
 from moonwalking.testing import send_eth
 
@@ -67,6 +74,165 @@ async def test_lnd(lnd_helper, fee_mocker):
 async def test_get_addr_hash():
     addr = '0x4092678e4E78230F46A1534C0fbc8fA39780892B'
     lnd = Lendingblock()
-    assert lnd.get_addr_hash(addr) == \
-        '0000000000000000000000004092678e4e78230f46a1534c0fbc8fa39780892b'
-    assert lnd.get_addr_hash(addr[2:]) == ''
+    with pytest.deprecated_call():
+        assert lnd.get_addr_hash(addr) == \
+            '0000000000000000000000004092678e4e78230f46a1534c0fbc8fa39780892b'
+    with pytest.deprecated_call():
+        assert lnd.get_addr_hash(addr[2:]) == ''
+
+
+async def test_get_balances_bad_address(mocker):
+    lnd = Lendingblock()
+    mocker.patch.object(lnd, 'get_contract_addr', lambda: '0x' + '22' * 20)
+    with pytest.raises(ValueError):
+        await lnd.get_balances(['0x4092678e4E78230F46A1534C0fbc8fA397808'])
+
+
+def balance_of(data):
+    # the balance is the last byte of the address
+    return (int(data[-2:], 16) * 10 ** 17 + 1).to_bytes(32, 'big')
+
+
+async def test_get_balances_multicall(mocker):
+    lnd = Lendingblock()
+    lnd.MULTICALL_ADDR = '0x' + '33' * 20
+    lnd.MULTICALL_SIZE = 2
+    mocker.patch.object(lnd, 'get_contract_addr', lambda: '0x' + '22' * 20)
+    aggregates = []
+
+    async def post_json(data):
+        results = []
+        for call in data:
+            payload = call['params'][0]['data']
+            assert payload.startswith(MULTICALL_ABI['aggregate'].selector)
+            calls, = decode_abi(
+                ['(address,bytes)[]'], HexBytes(payload[10:])
+            )
+            aggregates.append(len(calls))
+            results.append(encode_abi(['uint256', 'bytes[]'], [
+                1, [balance_of(data.hex()) for _, data in calls]
+            ]).hex())
+        return [
+            {'id': call['id'], 'result': '0x' + result}
+            for call, result in zip(data, results)
+        ]
+
+    mocker.patch.object(lnd, 'post_json', post_json)
+    addrs = ['0x' + f'{i:040x}' for i in range(1, 6)]
+    balances = await lnd.get_balances(addrs)
+    assert aggregates == [2, 2, 1]
+    assert balances[addrs[0]] == D('0.100000000000000001')
+    assert balances[addrs[4]] == D('0.500000000000000001')
+
+
+async def test_get_balance_exact(mocker):
+    lnd = Lendingblock()
+    mocker.patch.object(lnd, 'get_contract_addr', lambda: '0x' + '22' * 20)
+
+    async def post_json(data):
+        return [
+            {'id': call['id'], 'result': '0x' + balance_of(
+                call['params'][0]['data']
+            ).hex()}
+            for call in data
+        ]
+
+    mocker.patch.object(lnd, 'post_json', post_json)
+    addr = '0x' + 'ff' * 20
+    assert await lnd.get_balance(addr) == D('25.500000000000000001')
+
+
+async def test_build_tx_disperse(mocker):
+    lnd = Lendingblock()
+    lnd.DISPERSE_ADDR = '0x' + '44' * 20
+    lnd.DISPERSE_MAX_GAS = lnd.DISPERSE_GAS + 2 * lnd.DISPERSE_TRANSFER_GAS
+    contract_addr = '0x' + '22' * 20
+    mocker.patch.object(lnd, 'get_contract_addr', lambda: contract_addr)
+
+    async def post_json(data):
+        if isinstance(data, list):
+            # gas estimates
+            return [{'id': call['id'], 'result': hex(30000)} for call in data]
+        if data['method'] == 'eth_getTransactionCount':
+            return {'result': '0x7'}
+        # allowance
+        return {'result': '0x' + bytes(32).hex()}
+
+    async def get_gas_price():
+        return 10
+
+    mocker.patch.object(lnd, 'post_json', post_json)
+    mocker.patch.object(lnd, 'get_gas_price', get_gas_price)
+    addrs = [
+        (Account.privateKeyToAccount(PRIV_KEY).address, D(i))
+        for i in range(1, 6)
+    ]
+    tx = await lnd.build_tx(PRIV_KEY, addrs)
+    assert [tx_dict['nonce'] for tx_dict in tx] == [7, 8, 9, 10]
+    approve = lnd.contract_abi['approve']
+    assert tx[0]['to'] == contract_addr
+    assert tx[0]['data'] == approve.encode(lnd.DISPERSE_ADDR, 15 * 10 ** 18)
+    disperse = DISPERSE_ABI['disperseToken']
+    values = []
+    for tx_dict in tx[1:]:
+        assert tx_dict['to'] == to_checksum_address(lnd.DISPERSE_ADDR)
+        assert tx_dict['data'].startswith(disperse.selector)
+        token, _, amounts = decode_abi(
+            disperse.inputs, HexBytes(tx_dict['data'][10:])
+        )
+        assert token == contract_addr
+        values.extend(amounts)
+    assert values == [i * 10 ** 18 for i in range(1, 6)]
+    assert tx[1]['gas'] == lnd.DISPERSE_MAX_GAS
+
+    tx = await lnd.build_tx(PRIV_KEY, addrs, disperse=False)
+    assert [tx_dict['gas'] for tx_dict in tx] == [36000] * 5
+
+
+async def test_build_tx_disperse_concurrently(mocker):
+    lnd = Lendingblock(urls=('http://disperse-node',))
+    lnd.NONCE_MANAGER = True
+    lnd.DISPERSE_ADDR = '0x' + '44' * 20
+    mocker.patch.object(lnd, 'get_contract_addr', lambda: '0x' + '22' * 20)
+    sender = Account.privateKeyToAccount(PRIV_KEY).address
+
+    async def post_json(data):
+        await asyncio.sleep(0)
+        if data['method'] == 'eth_getTransactionCount':
+            return {'result': '0x7'}
+        # some allowance left by an earlier payout
+        return {'result': '0x' + (10 ** 18).to_bytes(32, 'big').hex()}
+
+    async def get_gas_price():
+        return 10
+
+    mocker.patch.object(lnd, 'post_json', post_json)
+    mocker.patch.object(lnd, 'get_gas_price', get_gas_price)
+    lnd.nonce_manager.release(sender, await lnd.get_nonces(sender, 1))
+    payouts = await asyncio.gather(*(
+        lnd.build_tx(PRIV_KEY, [(sender, D(amount))] * 3)
+        for amount in (1, 2)
+    ))
+    approve = lnd.contract_abi['approve']
+    nonces = []
+    for amount, tx in zip((1, 2), payouts):
+        assert [tx_dict['data'] for tx_dict in tx[:2]] == [
+            approve.encode(lnd.DISPERSE_ADDR, 0),
+            approve.encode(lnd.DISPERSE_ADDR, 3 * amount * 10 ** 18),
+        ]
+        assert len(tx) == 3
+        nonces.append([tx_dict['nonce'] for tx_dict in tx])
+    # each payout runs its approve and disperse calls back to back
+    assert sorted(nonces) == [[8, 9, 10], [11, 12, 13]]
+    await lnd.close()
+
+
+def test_contracts_from_config():
+    lnd = Lendingblock(
+        contract_addr='0x' + '22' * 20, disperse_addr='0x' + '44' * 20
+    )
+    other = Lendingblock(contract_addr='0x' + '55' * 20)
+    assert lnd.get_contract_addr() == to_checksum_address('0x' + '22' * 20)
+    assert other.get_contract_addr() == to_checksum_address('0x' + '55' * 20)
+    assert lnd.DISPERSE_ADDR == '0x' + '44' * 20
+    assert other.DISPERSE_ADDR == Lendingblock.DISPERSE_ADDR
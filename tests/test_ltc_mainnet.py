@@ -22,9 +22,8 @@ async def test_litecoincreate_wallet():
     assert pycoin.key.Key.from_text(priv2).address() == addr2
 
 
-async def test_litecoin_validate_addr(mocker):
-    ltc = Litecoin()
-    mocker.patch('moonwalking.settings.USE_TESTNET', None)
+async def test_litecoin_validate_addr():
+    ltc = Litecoin(network='mainnet')
 
     # testnet address
     assert ltc.validate_addr('mn8eCaT46d8mEn62ussMtE467J4mSgu5zA') is None
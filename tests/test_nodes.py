@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientConnectionError
+
+from moonwalking.main import Bitcoin, Ethereum
+
+URLS = ('http://node0', 'http://node1', 'http://node2')
+
+
+def fake_nodes(block, heights, down=()):
+    calls = []
+
+    async def send(node, data):
+        calls.append((node.url, data['method']))
+        await asyncio.sleep(0)
+        if node.url in down:
+            raise ClientConnectionError(node.url)
+        if data['method'] == block.HEIGHT_METHOD:
+            return {'result': hex(heights[node.url])}
+        return {'result': node.url}
+
+    block.nodes.send = send
+    return calls
+
+
+async def test_reads_are_balanced():
+    eth = Ethereum(urls=URLS)
+    calls = fake_nodes(eth, {})
+    eth.nodes.start_probing = lambda: None
+    results = await asyncio.gather(*(eth.post('eth_gasPrice') for _ in URLS))
+    assert sorted(results) == list(URLS)
+    assert len(calls) == 3
+    await eth.close()
+
+
+async def test_failover():
+    eth = Ethereum(urls=URLS)
+    calls = fake_nodes(eth, {}, down=URLS[:2])
+    eth.nodes.start_probing = lambda: None
+    assert await eth.post('eth_getTransactionCount', '0x0') == URLS[2]
+    assert [url for url, _ in calls] == list(URLS)
+    # pinned calls stay on the first healthy node
+    assert await eth.post('eth_getTransactionCount', '0x0') == URLS[2]
+    assert await eth.post('eth_gasPrice') == URLS[2]
+    assert len(calls) == 5
+    await eth.close()
+
+
+async def test_failover_all_down():
+    eth = Ethereum(urls=URLS)
+    fake_nodes(eth, {}, down=URLS)
+    eth.nodes.start_probing = lambda: None
+    with pytest.raises(ClientConnectionError):
+        await eth.post('eth_gasPrice')
+    await eth.close()
+
+
+async def test_broadcast():
+    btc = Bitcoin(urls=URLS)
+    calls = fake_nodes(btc, {}, down=URLS[:1])
+    btc.nodes.start_probing = lambda: None
+    assert await btc.post('sendrawtransaction', '00') == URLS[1]
+    assert sorted(calls) == [(url, 'sendrawtransaction') for url in URLS]
+    await btc.close()
+
+
+async def test_broadcast_prefers_result():
+    btc = Bitcoin(urls=URLS)
+    btc.nodes.start_probing = lambda: None
+
+    async def send(node, data):
+        if node.url == URLS[1]:
+            return {'result': 'txid', 'error': None}
+        return {'result': None, 'error': {'message': 'missing inputs'}}
+
+    btc.nodes.send = send
+    assert await btc.post('sendrawtransaction', '00') == 'txid'
+    await btc.close()
+
+
+async def test_wallet_node():
+    btc = Bitcoin(urls=URLS, wallet_url=URLS[1])
+    calls = fake_nodes(btc, {})
+    btc.nodes.start_probing = lambda: None
+    assert await btc.post('listunspent', 0) == URLS[1]
+    assert await btc.post('importaddress', 'addr', '', False) == URLS[1]
+    assert len(calls) == 2
+    await btc.close()
+
+
+async def test_wallet_node_down():
+    btc = Bitcoin(urls=URLS)
+    calls = fake_nodes(btc, {}, down=URLS[:1])
+    btc.nodes.start_probing = lambda: None
+    # the other nodes do not have the imported addresses
+    with pytest.raises(ClientConnectionError):
+        await btc.post('listunspent', 0)
+    assert calls == [(URLS[0], 'listunspent')]
+    await btc.close()
+
+
+async def test_probe():
+    eth = Ethereum(urls=URLS, max_lag=2)
+    fake_nodes(eth, {URLS[0]: 100, URLS[1]: 98, URLS[2]: 97})
+    await eth.nodes.probe()
+    assert [node.height for node in eth.nodes.nodes] == [100, 98, 97]
+    assert [node.healthy for node in eth.nodes.nodes] == [True, True, False]
+    await eth.close()
+
+
+def test_urls_from_settings(mocker):
+    mocker.patch.object(Bitcoin, 'URL', ','.join(URLS))
+    btc = Bitcoin()
+    assert btc.URL == URLS[0]
+    assert [node.url for node in btc.nodes.nodes] == list(URLS)
@@ -0,0 +1,52 @@
+import asyncio
+
+from moonwalking.blocks.nonce import NonceManager
+
+ADDR = '0x' + '11' * 20
+
+
+class FakeBlock:
+    def __init__(self, count):
+        self.count = count
+        self.calls = 0
+
+    async def get_transaction_count(self, addr):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.count
+
+
+async def test_allocate_concurrently():
+    block = FakeBlock(5)
+    nonces = NonceManager(block)
+    allocated = await asyncio.gather(*(
+        nonces.allocate(ADDR, 2) for _ in range(3)
+    ))
+    assert block.calls == 1
+    assert sorted(n for batch in allocated for n in batch) == list(
+        range(5, 11)
+    )
+
+
+async def test_release_and_resync():
+    block = FakeBlock(0)
+    nonces = NonceManager(block)
+    assert await nonces.allocate(ADDR, 4) == [0, 1, 2, 3]
+    nonces.release(ADDR, [2, 1, 7])
+    assert await nonces.allocate(ADDR) == [1]
+    assert await nonces.allocate(ADDR, 2) == [2, 4]
+    nonces.release(ADDR, [3])
+    block.count = 8
+    await nonces.resync(ADDR)
+    assert await nonces.allocate(ADDR) == [8]
+    nonces.reset(ADDR)
+    assert await nonces.allocate(ADDR) == [8]
+    assert block.calls == 3
+
+
+async def test_allocate_contiguous():
+    nonces = NonceManager(FakeBlock(0))
+    assert await nonces.allocate(ADDR, 3) == [0, 1, 2]
+    nonces.release(ADDR, [0, 2])
+    assert await nonces.allocate(ADDR, 2, contiguous=True) == [3, 4]
+    assert await nonces.allocate(ADDR, 2) == [0, 2]
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from moonwalking.pool import WalletPool
+
+
+class FakeBlock:
+    CCY = 'fake'
+
+    def __init__(self):
+        self.batches = []
+        self.funded = []
+
+    async def create_wallets(self, n):
+        self.batches.append(n)
+        await asyncio.sleep(0)
+        start = sum(self.batches[:-1])
+        return [(f'addr{i}', f'priv{i}') for i in range(start, start + n)]
+
+    async def create_pooled_wallets(self, n):
+        return await self.create_wallets(n)
+
+    async def fund_wallets(self, wallets):
+        self.funded.append([addr for addr, _ in wallets])
+
+
+async def test_wallet_pool():
+    block = FakeBlock()
+    pool = WalletPool(block, low=2, high=5, batch=3)
+    wallets = await asyncio.gather(pool.get(), pool.get())
+    assert wallets == [('addr0', 'priv0'), ('addr1', 'priv1')]
+    assert block.batches == [3, 2]
+    assert len(pool) == 3
+
+    assert await pool.get() == ('addr2', 'priv2')
+    assert len(pool) == 2
+    assert block.batches == [3, 2]
+    # below the low watermark, refilled in the background
+    assert await pool.get() == ('addr3', 'priv3')
+    await pool.task
+    assert len(pool) == 5
+    assert block.batches == [3, 2, 3, 1]
+
+
+def test_wallet_pool_sizes():
+    with pytest.raises(AssertionError):
+        WalletPool(FakeBlock(), low=0, high=0, batch=1)
+
+
+async def test_wallet_pool_funds_handed_out():
+    block = FakeBlock()
+    pool = WalletPool(block, low=0, high=5, batch=5)
+    await asyncio.gather(*(pool.get() for _ in range(3)))
+    assert len(pool) == 2
+    # the wallets left in the pool are not funded
+    assert block.funded == [['addr0', 'addr1', 'addr2']]
+    await pool.get()
+    assert block.funded == [['addr0', 'addr1', 'addr2'], ['addr3']]
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+import pytest
+
+from moonwalking.blocks.registry import BlockRegistry
+
+
+class Block:
+    CCY = 'fake'
+
+
+def test_registry():
+    registry = BlockRegistry({'btc': 'moonwalking.blocks.bitcoin:Bitcoin'})
+    registry.register(Block)
+    assert set(registry) == {'btc', 'fake'}
+    assert 'fake' in registry
+    assert registry.get('other') is None
+    block = registry['fake']
+    assert isinstance(block, Block)
+    assert registry['fake'] is block
+    with pytest.raises(ValueError):
+        registry.register(Block)
+
+
+def test_lazy_imports():
+    code = (
+        'import sys\n'
+        'from moonwalking import wallets\n'
+        "assert wallets.block('btc').CCY == 'btc'\n"
+        "eth = {'bitcash', 'eth_account', 'eth_abi', 'cashaddress'}\n"
+        'assert not eth & set(sys.modules), eth & set(sys.modules)\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
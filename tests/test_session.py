@@ -0,0 +1,36 @@
+from moonwalking.main import Bitcoin, Ethereum, Lendingblock
+
+# a node of its own, the blocks of the other tests keep theirs open
+URLS = ('http://session-node:8545',)
+
+
+async def test_session_is_reused():
+    eth = Ethereum(urls=URLS)
+    session = eth.session
+    assert session is eth.session
+    lnd = Lendingblock(urls=URLS)
+    assert session is lnd.session
+    assert session is not Bitcoin().session
+    await lnd.close()
+    await eth.close()
+    assert session.closed
+    assert eth.session is not session
+    await eth.close()
+
+
+async def test_context_manager():
+    async with Ethereum(urls=URLS) as eth:
+        session = eth.session
+        assert not session.closed
+    assert session.closed
+
+
+async def test_shared_session_stays_open():
+    eth = Ethereum(urls=URLS)
+    lnd = Lendingblock(urls=URLS)
+    session = lnd.session
+    assert eth.session is session
+    await eth.close()
+    assert not session.closed
+    await lnd.close()
+    assert session.closed
@@ -0,0 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from pycoin.key import Key
+from pycoin.tx.Spendable import Spendable
+from pycoin.tx.Tx import Tx
+from pycoin.tx.TxOut import TxOut
+from pycoin.ui import standard_tx_out_script
+
+from moonwalking.blocks.eth_generic import get_account
+from moonwalking.main import Bitcoin, Ethereum
+
+WIF = Key(secret_exponent=1234567, netcode='XTN').wif()
+ETH_PRIV = '0x' + '11' * 32
+
+
+def make_tx(n_in):
+    script = standard_tx_out_script(Key.from_text(WIF).address())
+    spendables = [
+        Spendable(10000, script, bytes([i + 1]) * 32, 0) for i in range(n_in)
+    ]
+    tx = Tx(
+        version=1,
+        txs_in=[spendable.tx_in() for spendable in spendables],
+        txs_out=[TxOut(10000 * n_in - 1000, script)],
+    )
+    tx.set_unspents(spendables)
+    return tx
+
+
+@pytest.mark.parametrize('executor_class', [
+    ThreadPoolExecutor, ProcessPoolExecutor
+])
+async def test_sign_in_shards(executor_class):
+    block = Bitcoin()
+    block.SIGN_SHARD_SIZE = 3
+    expected = block.sign_tx(WIF, make_tx(7))
+    with executor_class(max_workers=2) as executor:
+        block.executor = executor
+        tx = await block.sign(WIF, make_tx(7))
+    assert tx.bad_signature_count() == 0
+    assert tx.as_hex() == expected.as_hex()
+
+
+async def test_sign_eth_batch():
+    block = Ethereum()
+    account = get_account(ETH_PRIV)
+    assert get_account(account) is account
+    tx = [
+        {
+            'from': account.address,
+            'to': account.address,
+            'value': 1000,
+            'gas': 21000,
+            'gasPrice': 10 ** 9,
+            'data': '',
+            'chainId': 4,
+            'nonce': nonce,
+        }
+        for nonce in range(3)
+    ]
+    expected = block.sign_tx(ETH_PRIV, tx)
+    assert len(set(expected)) == 3
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        block.executor = executor
+        assert await block.sign(account, tx) == expected
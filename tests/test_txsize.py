@@ -0,0 +1,45 @@
+from pycoin.tx.Spendable import Spendable
+from pycoin.tx.Tx import Tx
+from pycoin.tx.TxOut import TxOut
+from pycoin.ui import standard_tx_out_script
+
+from moonwalking.blocks.txsize import (
+    P2PKH, P2WPKH, estimate_size, estimate_size_for, script_type, tx_size
+)
+
+ADDR = 'mtXWDB6k5yC5v7TcwKZHB89SUp85yCKshy'
+
+
+def test_estimate_p2pkh():
+    size = estimate_size_for(1, 2)
+    assert size.size == size.vsize == 226
+    assert size.weight == 4 * 226
+    assert estimate_size_for(300, 1).size == 10 + 2 + 300 * 148 + 34
+
+
+def test_estimate_segwit():
+    size = estimate_size_for(1, 2, P2WPKH, P2WPKH)
+    assert size.weight == 4 * (10 + 41 + 2 * 31) + 2 + 108
+    assert size.vsize == 141
+    mixed = estimate_size([P2PKH, P2WPKH], [P2PKH])
+    assert mixed.weight == 4 * (10 + 148 + 41 + 34) + 2 + 1 + 108
+
+
+def test_script_type():
+    assert script_type(standard_tx_out_script(ADDR)) == P2PKH
+    assert script_type(b'\x00\x14' + bytes(20)) == P2WPKH
+    assert script_type(b'\x6a') is None
+
+
+def test_tx_size():
+    script = standard_tx_out_script(ADDR)
+    spendables = [
+        Spendable(10000, script, bytes([i + 1]) * 32, 0) for i in range(3)
+    ]
+    tx = Tx(
+        version=1,
+        txs_in=[spendable.tx_in() for spendable in spendables],
+        txs_out=[TxOut(1000, script), TxOut(2000, script)],
+    )
+    tx.set_unspents(spendables)
+    assert tx_size(tx) == estimate_size_for(3, 2)
@@ -0,0 +1,51 @@
+from moonwalking import wallets
+from moonwalking.blocks.validate import address_netcode, get_validator
+from moonwalking.main import BitcoinCash, Ethereum
+
+
+async def test_validate_addrs():
+    eth = Ethereum()
+    eth.VALIDATION_CHUNK_SIZE = 2
+    addr = '0x0dE0BCb0703ff8F1aEb8C892eDbE692683bD8030'
+    result = await eth.validate_addrs([addr, 'nope', addr, 'foo', 'bar'])
+    assert result == {addr: addr, 'nope': None, 'foo': None, 'bar': None}
+    await eth.close()
+
+
+async def test_validate_addrs_bch():
+    cashaddr = 'bchtest:qzrj8vg8vz2ry3jgh4dx6e8qkjmzj4nrdqcv2v7f2v'
+    bch = BitcoinCash()
+    result = await bch.validate_addrs(
+        ['mhstAGNEZYNxwpwgAqwX31sK2TK7SntHCK', cashaddr]
+    )
+    assert result['mhstAGNEZYNxwpwgAqwX31sK2TK7SntHCK'] == \
+        'mhstAGNEZYNxwpwgAqwX31sK2TK7SntHCK'
+    assert set(result) == {'mhstAGNEZYNxwpwgAqwX31sK2TK7SntHCK', cashaddr}
+    await bch.close()
+
+
+async def test_validate_addrs_by_currency():
+    addr, _ = wallets.create_addr('eth')
+    assert await wallets.validate_addrs('eth', [addr, 'x']) == {
+        addr: addr, 'x': None
+    }
+
+
+def test_address_netcode_cached():
+    address_netcode.cache_clear()
+    assert address_netcode('1F1tAaz5x1HUXrCNLbtMDqcw6o5GNn4xqX') == 'BTC'
+    assert address_netcode('1F1tAaz5x1HUXrCNLbtMDqcw6o5GNn4xqX') == 'BTC'
+    assert address_netcode('nope') is None
+    info = address_netcode.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_get_validator():
+    testnet_addr = 'mtXWDB6k5yC5v7TcwKZHB89SUp85yCKshy'
+    mainnet_addr = '1F1tAaz5x1HUXrCNLbtMDqcw6o5GNn4xqX'
+    validate = get_validator('BTC', ('testnet', 'mainnet'))
+    assert validate(testnet_addr) == testnet_addr
+    assert validate(mainnet_addr) == mainnet_addr
+    assert get_validator('btc')(testnet_addr) is None
+    assert get_validator('ltc')(mainnet_addr) is None
+    assert get_validator('fake_currency') is None